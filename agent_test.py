@@ -3,14 +3,71 @@ tests to run and debug your minimax and alphabeta agents locally.  The test
 cases used by the project assistant are not public.
 """
 
+import contextlib
+import io
+import os
+import pickle
+import random
+import tempfile
+import time
 import unittest
+import unittest.mock
 
+import benchmark
+import book as bookgen
 import isolation
 import game_agent
+import lazy_smp
+import ponder
+import records
+import tournament
 from importlib import reload
+from sprt import SPRT, elo_to_score, score_to_elo
 from sample_players import (RandomPlayer, GreedyPlayer, open_move_score,
                             improved_score, center_score)
 
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+class StockBoard:
+    """A board without the methods that the stock `isolation.Board` of the
+    project reviewers lacks.
+    """
+    HIDDEN = {"count_legal_moves", "is_partitioned", "get_region",
+              "longest_path", "push", "pop", "canonical", "canonical_hash",
+              "to_canonical", "from_canonical"}
+
+    def __init__(self, board):
+        self._board = board
+
+    def __getattr__(self, name):
+        if name in self.HIDDEN:
+            raise AttributeError(name)
+        return getattr(self._board, name)
+
+    def copy(self):
+        return StockBoard(self._board.copy())
+
+    def forecast_move(self, move):
+        return StockBoard(self._board.forecast_move(move))
+
+
+class SortedPlayer:
+    """A player of the smallest (or largest) legal move, which does not depend
+    on the order of the legal moves.
+    """
+    def __init__(self, largest=False):
+        self.largest = largest
+
+    def get_move(self, game, time_left):
+        moves = game.get_legal_moves()
+        if not moves:
+            return (-1, -1)
+        return max(moves) if self.largest else min(moves)
+
 
 class IsolationTest(unittest.TestCase):
     """Unit tests for isolation agents"""
@@ -21,6 +78,604 @@ class IsolationTest(unittest.TestCase):
         self.player2 = "Player2"
         self.game = isolation.Board(self.player1, self.player2)
 
+    def test_board_moves(self):
+        self.game.apply_move((2, 3))
+        self.game.apply_move((0, 5))
+        self.assertEqual(sorted(self.game.get_legal_moves()),
+                         [(0, 2), (0, 4), (1, 1), (1, 5), (3, 1), (3, 5),
+                          (4, 2), (4, 4)])
+        self.assertEqual(sorted(self.game.get_legal_moves(self.player2)),
+                         [(1, 3), (2, 4), (2, 6)])
+
+        new_game = self.game.forecast_move((4, 4))
+        self.assertEqual(new_game.get_player_location(self.player1), (4, 4))
+        self.assertEqual(self.game.get_player_location(self.player1), (2, 3))
+        self.assertEqual(len(new_game.get_blank_spaces()), 46)
+        self.assertEqual(len(self.game.get_blank_spaces()), 47)
+
+    def test_unshuffled_moves(self):
+        # Without shuffling, moves come in the order of DIRECTIONS (and blank
+        # cells in board order) whatever the random state
+        game = isolation.Board(self.player1, self.player2, shuffle=False)
+        first = game.get_legal_moves()
+        self.assertEqual(first, game.get_blank_spaces())
+        game.apply_move((2, 3))
+        game.apply_move((0, 5))
+        orders = set()
+        for seed in range(5):
+            random.seed(seed)
+            orders.add(tuple(game.copy().get_legal_moves()))
+            orders.add(tuple(game.forecast_move((4, 4)).get_legal_moves()))
+        expected = [(2 + dr, 3 + dc) for dr, dc in isolation.isolation.DIRECTIONS
+                    if (2 + dr, 3 + dc) in game.get_blank_spaces()]
+        self.assertIn(tuple(expected), orders)
+        self.assertEqual(len(orders), 2)
+
+    def test_legal_moves_cache(self):
+        self.game.apply_move((2, 3))
+        self.game.apply_move((0, 5))
+        moves = self.game.get_legal_moves(self.player2)
+        moves.clear()
+        self.assertEqual(self.game.count_legal_moves(self.player2), 3)
+
+        # The memoized moves are discarded when a move is applied or undone
+        self.game.push((2, 4))
+        self.assertEqual(sorted(self.game.get_legal_moves(self.player2)),
+                         [(1, 3), (2, 6)])
+        self.game.pop()
+        self.assertEqual(self.game.count_legal_moves(self.player2), 3)
+
+    def test_push_pop(self):
+        self.game.apply_move((2, 3))
+        self.game.apply_move((0, 5))
+        state = self.game.to_string()
+
+        self.game.push((4, 4))
+        self.game.push((1, 3))
+        self.assertEqual(self.game.get_player_location(self.player2), (1, 3))
+        self.assertEqual(self.game.move_count, 4)
+        self.assertEqual(self.game.pop(), (1, 3))
+        self.assertEqual(self.game.pop(), (4, 4))
+
+        self.assertEqual(self.game.to_string(), state)
+        self.assertEqual(self.game.move_count, 2)
+        self.assertEqual(self.game.active_player, self.player1)
+        self.assertEqual(self.game.get_player_location(self.player1), (2, 3))
+        self.assertRaises(IndexError, self.game.pop)
+
+        # Copies keep their own undo stack
+        self.game.push((4, 4))
+        other = self.game.copy()
+        other.push((1, 3))
+        self.assertEqual(self.game.pop(), (4, 4))
+        self.assertEqual(other.pop(), (1, 3))
+        self.assertEqual(other.pop(), (4, 4))
+        self.assertEqual(other.to_string(), state)
+
+    def test_board_slots(self):
+        self.assertFalse(hasattr(self.game, "__dict__"))
+        self.game.apply_move((2, 3))
+        self.game.push((0, 5))
+        other = pickle.loads(pickle.dumps(self.game))
+        self.assertEqual(other.hash(), self.game.hash())
+        self.assertEqual(other.to_string(), self.game.to_string())
+        self.assertEqual(other.pop(), (0, 5))
+        self.assertEqual(self.game.pop(), (0, 5))
+        self.assertEqual(other.hash(), self.game.hash())
+
+    def test_endgame_solver(self):
+        # Play random moves on a 5x5 board until the players are cut off
+        rng = random.Random(42)
+        player = game_agent.AlphaBetaPlayer()
+        game = isolation.Board(player, self.player2, 5, 5, shuffle=False)
+        while not game.is_partitioned():
+            game.apply_move(rng.choice(game.get_legal_moves()))
+            if game.active_player != player:
+                game.apply_move(rng.choice(game.get_legal_moves()))
+        self.assertEqual(len(game.get_region(player)) +
+                         len(game.get_region(self.player2)),
+                         len(set(game.get_region(player) +
+                                 game.get_region(self.player2))))
+
+        def longest(loc, blank):
+            return max([1 + longest(move, blank - {move})
+                        for move in blank
+                        if {abs(move[0] - loc[0]), abs(move[1] - loc[1])} ==
+                        {1, 2}] or [0])
+
+        path = game.longest_path(player)
+        self.assertEqual(len(path), longest(
+            game.get_player_location(player), set(game.get_blank_spaces())))
+
+        move = player.get_move(game, lambda: 1e9)
+        self.assertEqual(move, path[0])
+        self.assertEqual(player._endgame_path, path[1:])
+
+        # The solver returns a legal move whenever the clock runs out
+        moves = [(3, 6), (3, 3), (4, 4), (1, 2), (5, 2), (2, 0), (4, 0),
+                 (4, 1), (2, 1), (6, 2), (0, 0)]
+        for budget in range(1, 10):
+            player = game_agent.AlphaBetaPlayer()
+            game = isolation.Board(self.player1, player)
+            for move in moves:
+                game.apply_move(move)
+            reads = iter(range(budget, -100, -1))
+            move = player.get_move(game, lambda: 1000. * next(reads))
+            self.assertIn(move, game.get_legal_moves())
+
+    def test_stock_board(self):
+        # The agents only use the stock Board API unless told otherwise
+        players = [game_agent.MinimaxPlayer(), game_agent.AlphaBetaPlayer(),
+                   game_agent.AlphaBetaPlayer(score_fn=improved_score)]
+        for player in players:
+            game = isolation.Board(player, self.player2, 5, 5)
+            game.apply_move((2, 2))
+            game.apply_move((0, 0))
+            while game.get_legal_moves():
+                if game.active_player == player:
+                    end = time.time() + 0.05
+                    move = player.get_move(StockBoard(game.copy()),
+                                           lambda: 1000 * (end - time.time()))
+                    self.assertIn(move, game.get_legal_moves())
+                else:
+                    move = game.get_legal_moves()[0]
+                game.apply_move(move)
+
+    def test_hash(self):
+        empty_hash = self.game.hash()
+        self.game.apply_move((2, 3))
+        self.game.apply_move((0, 5))
+        self.assertNotEqual(self.game.hash(), empty_hash)
+
+        # The same position reached through different boards hashes equally
+        other = isolation.Board(self.player1, self.player2)
+        other.push((2, 3))
+        other.push((0, 5))
+        self.assertEqual(other.hash(), self.game.hash())
+
+        # Side to move is part of the hash
+        other.push((4, 4))
+        self.assertNotEqual(other.hash(), self.game.hash())
+        other.pop()
+        other.pop()
+        other.pop()
+        self.assertEqual(other.hash(), empty_hash)
+
+    def test_canonical(self):
+        self.game.apply_move((2, 3))
+        self.game.apply_move((0, 5))
+        key, symmetry = self.game.canonical()
+
+        # Every rotation and reflection shares the canonical hash, and moves
+        # map to the corresponding move of the transformed board
+        for moves, image in (([(4, 3), (6, 5)], (2, 4)),
+                             ([(3, 2), (5, 0)], (4, 4)),
+                             ([(3, 4), (5, 6)], (4, 2))):
+            other = isolation.Board(self.player1, self.player2)
+            for move in moves:
+                other.apply_move(move)
+            self.assertNotEqual(other.hash(), self.game.hash())
+            self.assertEqual(other.canonical_hash(), key)
+
+            move = self.game.to_canonical((4, 4), symmetry)
+            self.assertEqual(self.game.from_canonical(move, symmetry), (4, 4))
+            self.assertEqual(other.from_canonical(move, other.canonical()[1]),
+                             image)
+
+        # The hashes are updated incrementally after the first call
+        self.game.push((4, 4))
+        child = self.game.forecast_move((2, 2))
+        self.assertNotEqual(self.game.canonical_hash(), key)
+        self.assertEqual(child._symmetric_hashes,
+                         child._compute_symmetric_hashes())
+        self.game.pop()
+        self.assertEqual(self.game.canonical(), (key, symmetry))
+
+    @unittest.skipIf(numpy is None, "NumPy is not installed")
+    def test_batch_eval(self):
+        import batch_eval
+        rng = random.Random(3)
+        player, opponent = "Player", "Opponent"
+        games = []
+        for _ in range(40):
+            game = isolation.Board(player, opponent, shuffle=False)
+            for _ in range(rng.randrange(40)):
+                moves = game.get_legal_moves()
+                if not moves:
+                    break
+                game.apply_move(rng.choice(moves))
+            games.append(game)
+
+        evaluator = batch_eval.BatchEvaluator()
+        batch = batch_eval.encode(games, player)
+        for score_fn in (improved_score, game_agent.custom_score,
+                         game_agent.custom_score_2, game_agent.custom_score_3):
+            scores = getattr(evaluator, score_fn.__name__)(*batch)
+            self.assertEqual(list(scores),
+                             [score_fn(game, player) for game in games])
+
+        game = games[5]
+        moves, scores = batch_eval.score_children(game, player)
+        self.assertEqual(list(scores),
+                         [game_agent.custom_score(game.forecast_move(move),
+                                                  player) for move in moves])
+
+    def test_transposition_table(self):
+        tt = game_agent.TranspositionTable(size_mb=0, policy="depth")
+        self.assertEqual(tt.capacity, 1)
+        tt.store(1, 4, tt.EXACT, 2., (0, 0))
+        tt.store(2, 3, tt.LOWER, 5., (1, 1))
+        self.assertEqual(tt.probe(1)[1:4], (4, tt.EXACT, 2.))
+        self.assertIsNone(tt.probe(2))
+
+        # Entries from an earlier search are always replaced
+        tt.new_search()
+        tt.store(2, 3, tt.LOWER, 5., (1, 1))
+        self.assertEqual(tt.probe(2)[1:4], (3, tt.LOWER, 5.))
+        self.assertEqual(tt.stats()["hits"], 2)
+
+    def test_move_ordering(self):
+        ordering = game_agent.KillerHistoryOrdering()
+        moves = [(0, 0), (1, 2), (2, 1), (3, 3)]
+        ordering.record(2, 3, (2, 1), 3, True)
+        ordering.record(2, 1, (3, 3), 1, True)
+        ordering.record(4, 4, (0, 0), 4, True)
+
+        self.assertEqual(ordering.order(moves, 2, hint=(1, 2)),
+                         [(1, 2), (3, 3), (2, 1), (0, 0)])
+        self.assertEqual(ordering.order(moves, 0)[0], (0, 0))
+        self.assertAlmostEqual(ordering.stats()["first_move_cutoff_rate"], 1 / 3)
+
+    def test_search_stats(self):
+        player = game_agent.AlphaBetaPlayer(score_fn=open_move_score)
+        game = isolation.Board(player, GreedyPlayer())
+        for _ in range(4):
+            end = time.time() + 0.05
+            time_left = lambda: 1000 * (end - time.time())
+            game.apply_move(game.active_player.get_move(game, time_left))
+        self.assertEqual([s.move_count for s in player.game_stats], [0, 2])
+        # the first move comes from the opening rules, without a search
+        self.assertEqual(player.game_stats[0].nodes, 0)
+        stats = player.game_stats[1]
+        self.assertGreater(stats.nodes, stats.cutoffs)
+        self.assertGreater(stats.leaves, 0)
+        self.assertGreater(stats.depth, 0)
+
+        # a new game starts a new record
+        game = isolation.Board(player, GreedyPlayer())
+        end = time.time() + 0.05
+        player.get_move(game, lambda: 1000 * (end - time.time()))
+        self.assertEqual(len(player.game_stats), 1)
+
+    def test_timer_checks(self):
+        player = game_agent.AlphaBetaPlayer()
+        game = isolation.Board(player, GreedyPlayer())
+        game.apply_move((2, 3))
+        game.apply_move((0, 5))
+        calls = []
+        def time_left():
+            calls.append(1)
+            return 1e6 - len(calls) * 0.01
+        player.time_left = time_left
+        player.alphabeta(game, 5)
+        self.assertLess(len(calls), player.nodes / 10)
+
+        # the root reads the clock, so an expired timer stops the search
+        player.time_left = lambda: 5.
+        with self.assertRaises(game_agent.SearchTimeout):
+            player.alphabeta(game, 5)
+
+    def test_partial_iteration(self):
+        player = game_agent.AlphaBetaPlayer()
+        player.time_left = lambda: 1e9
+        game = isolation.Board(player, GreedyPlayer(), shuffle=False)
+        game.apply_move((2, 3))
+        game.apply_move((0, 5))
+        player._pv_move = player.alphabeta(game, 3)
+        score = player._root_score
+
+        # The timer expires when the root starts its third move
+        min_value = player.min_value
+        def timed_min_value(child, depth, alpha, beta):
+            if depth == 2:
+                root_moves.append(child)
+                if len(root_moves) == 3:
+                    raise game_agent.SearchTimeout()
+            return min_value(child, depth, alpha, beta)
+        player.min_value = timed_min_value
+
+        root_moves = []
+        with self.assertRaises(game_agent.SearchTimeout):
+            player.alphabeta(game, 3)
+        self.assertIsNotNone(player._partial_move)
+
+        # An aspiration window that the iteration fails low on only bounds
+        # the scores of the searched moves, so none of them is a result
+        root_moves = []
+        with self.assertRaises(game_agent.SearchTimeout):
+            player.alphabeta(game, 3, score + 10., score + 11.)
+        self.assertIsNone(player._partial_move)
+
+    def test_time_manager(self):
+        manager = game_agent.TimeManager()
+        manager.new_search()
+        self.assertTrue(manager.can_start(0.))
+        manager.record(10, 1.)
+        manager.record(40, 4.)
+        manager.record(160, 16.)
+        self.assertAlmostEqual(manager.branching_factor(), 4.)
+        self.assertAlmostEqual(manager.predict(), 64.)
+        self.assertFalse(manager.can_start(50.))
+        self.assertTrue(manager.can_start(70.))
+
+        player = game_agent.AlphaBetaPlayer(time_manager=manager)
+        game = isolation.Board(player, GreedyPlayer())
+        game.apply_move((2, 3))
+        game.apply_move((0, 5))
+        end = time.time() + 0.1
+        move = player.get_move(game, lambda: 1000 * (end - time.time()))
+        self.assertIn(move, game.get_legal_moves())
+        self.assertEqual(manager.searches, 2)
+        self.assertGreater(manager.skipped + manager.aborted, 0)
+
+    def test_pvs_aspiration(self):
+        scores = []
+        for options in ({}, {"pvs": True}, {"aspiration": 1.},
+                        {"pvs": True, "aspiration": 1.}):
+            player = game_agent.AlphaBetaPlayer(
+                tt_size_mb=1, move_ordering=game_agent.KillerHistoryOrdering(),
+                **options)
+            player.time_left = lambda: 1e9
+            game = isolation.Board(player, GreedyPlayer(), shuffle=False)
+            game.apply_move((2, 3))
+            game.apply_move((0, 5))
+            player.iterative_deepening(game, (0, 0), max_depth=5)
+            self.assertEqual(player.depth_completed, 5)
+            scores.append(player._root_score)
+        self.assertEqual(len(set(scores)), 1)
+
+    def test_deepening_stops(self):
+        # Without a time manager or a depth limit, deepening still stops once
+        # the game is solved, and never goes deeper than the blank cells
+        player = game_agent.AlphaBetaPlayer(tt_size_mb=1)
+        player.time_left = lambda: 1e9
+        game = isolation.Board(player, GreedyPlayer(), 5, 5, shuffle=False)
+        for move in [(2, 2), (0, 0), (0, 1), (1, 2), (2, 0), (3, 3)]:
+            game.apply_move(move)
+        move = player.iterative_deepening(game, (-1, -1))
+        self.assertIn(move, game.get_legal_moves())
+        self.assertEqual(abs(player._root_score), float("inf"))
+        self.assertLessEqual(player.depth_completed,
+                             len(game.get_blank_spaces()))
+
+    def test_opening_book(self):
+        book = bookgen.build(5, 5, plies=2, depth=3)
+        self.assertEqual(len(book), 1 + 6)
+
+        path = os.path.join(tempfile.mkdtemp(), "book.bin")
+        book.save(path)
+        player = game_agent.AlphaBetaPlayer(book=path)
+        self.assertEqual(len(player.book), len(book))
+
+        # Symmetric positions share an entry, and the move is mapped back
+        # to the orientation of the board
+        game = isolation.Board(player, self.player2, 5, 5, shuffle=False)
+        game.apply_move((2, 3))
+        move = player.book.probe(game)
+        self.assertIn(move, game.get_legal_moves())
+        self.assertEqual(player.get_move(game, lambda: 1e9), move)
+        mirror = isolation.Board(player, self.player2, 5, 5, shuffle=False)
+        mirror.apply_move((3, 2))
+        self.assertEqual(player.book.probe(mirror), move[::-1])
+
+        game.apply_move(move)
+        self.assertIsNone(player.book.probe(game))
+
+    def test_pondering(self):
+        player = ponder.PonderingPlayer(ponder_limit=50.)
+        game = isolation.Board(player, game_agent.AlphaBetaPlayer())
+        game.apply_move((2, 3))
+        game.apply_move((0, 5))
+        for _ in range(6):
+            end = time.time() + 0.05
+            time_left = lambda: 1000 * (end - time.time())
+            move = game.active_player.get_move(game, time_left)
+            self.assertIn(move, game.get_legal_moves())
+            game.apply_move(move)
+        self.assertEqual(player.ponder_stats()["ponders"], 2)
+
+        player.new_game()
+        self.assertIsNone(player._thread)
+
+    def test_lazy_smp(self):
+        tt = lazy_smp.SharedTranspositionTable(1)
+        tt.store(12345, 3, tt.LOWER, -2.5, (4, 6))
+        self.assertEqual(tt.probe(12345), (12345, 3, tt.LOWER, -2.5, (4, 6), 0))
+        self.assertIsNone(tt.probe(12345 + tt.capacity))
+        # moves of boards larger than 15x15 fit in the packed entries
+        tt.store(54321, 2, tt.EXACT, 1., (20, 254))
+        self.assertEqual(tt.probe(54321), (54321, 2, tt.EXACT, 1., (20, 254), 0))
+
+        player = lazy_smp.ParallelPlayer(processes=2)
+        game = isolation.Board(player, self.player2)
+        game.apply_move((2, 3))
+        game.apply_move((0, 5))
+        try:
+            for _ in range(2):
+                end = time.time() + 0.1
+                time_left = lambda: 1000 * (end - time.time())
+                move = player.get_move(game, time_left)
+                self.assertGreater(time_left(), 0)
+                self.assertIn(move, game.get_legal_moves())
+                game.apply_move(move)
+                game.apply_move(game.get_legal_moves()[0])
+            self.assertGreater(player.helper_nodes, 0)
+        finally:
+            player.close()
+
+        # Worker processes cannot start the helpers
+        with contextlib.redirect_stderr(io.StringIO()):
+            with self.assertRaises(SystemExit):
+                tournament.main(["--agents", "AB_LazySMP", "--workers", "2"])
+
+    @unittest.skipIf(numpy is None, "NumPy is not installed")
+    def test_selfplay_tuning(self):
+        import batch_eval
+        import selfplay
+        import tune
+        with tempfile.TemporaryDirectory() as tmp:
+            positions = selfplay.generate(tmp, 4, depth=2, chunk_size=50)
+            paths = selfplay.chunk_paths(tmp)
+            self.assertEqual(len(paths), -(-positions // 50))
+            chunks = list(selfplay.read_chunks(paths))
+            self.assertEqual(sum(len(chunk[2]) for chunk in chunks), positions)
+            features, scores, outcomes = chunks[0]
+            self.assertEqual(features.shape,
+                             (len(outcomes), len(batch_eval.FEATURES)))
+            self.assertEqual(set(outcomes.tolist()), {0, 1})
+
+            # Newton steps do not increase the loss of the zero weights
+            weights, loss, count = tune.fit(paths, decided=True)
+            self.assertEqual(count, positions)
+            self.assertEqual(sorted(weights),
+                             ["bias", "opp_moves", "own_moves"])
+            self.assertLessEqual(loss, numpy.log(2.))
+
+    def test_mcts(self):
+        player = game_agent.MCTSPlayer()
+        game = isolation.Board(player, self.player2)
+        game.apply_move((2, 3))
+        game.apply_move((0, 5))
+        end = time.time() + 0.05
+        time_left = lambda: 1000 * (end - time.time())
+        move = player.get_move(game, time_left)
+        self.assertIn(move, game.get_legal_moves())
+        self.assertGreater(time_left(), 0)
+        self.assertGreater(player.game_stats[-1].nodes, 0)
+
+        # The tree counts every simulation at the root
+        visits = player._tree[1]
+        self.assertEqual(visits[0], player.leaves)
+
+        # The simulation boards have the moves of the board
+        self.assertEqual(game_agent.DIRECTIONS, isolation.isolation.DIRECTIONS)
+        knight_moves = game_agent._knight_moves(game.width, game.height)
+        idx = 2 + 3 * game.height
+        board = isolation.Board(player, self.player2).forecast_move((2, 3))
+        self.assertEqual(sorted(i for _, i in knight_moves[idx]),
+                         sorted(r + c * game.height for r, c in
+                                board.get_legal_moves(player)))
+
+    @unittest.skipIf(not hasattr(os, "sched_getaffinity"),
+                     "the workers cannot be pinned to a core")
+    def test_game_runner(self):
+        players = [SortedPlayer(), SortedPlayer(largest=True)]
+        rng = random.Random(1)
+        games = []
+        for _ in range(3):
+            opening = tournament.random_opening(*players, rng=rng)
+            games.append((players[0], players[1], opening, 150, 7, 7))
+            games.append((players[1], players[0], opening, 150, 7, 7))
+        serial = tournament.GameRunner(players)
+        expected = serial.play(games)
+        self.assertEqual(serial.num_workers, 1)
+
+        # Pin both workers to the same core, so that the pool also starts
+        # on single-core machines
+        core = min(os.sched_getaffinity(0))
+        with unittest.mock.patch("os.sched_getaffinity",
+                                 return_value=[core, core]):
+            pool = tournament.GameRunner(players, num_workers=2, seed=1)
+        try:
+            self.assertEqual(pool.num_workers, 2)
+            results = list(pool.imap(games))
+        finally:
+            pool.close()
+        self.assertEqual([r[:2] for r in results], [r[:2] for r in expected])
+        # the records only differ by the move times
+        self.assertEqual([r[3]._replace(times=None) for r in results],
+                         [r[3]._replace(times=None) for r in expected])
+
+    def test_checkpoint(self):
+        cpu_agent = tournament.Agent(SortedPlayer(), "Smallest")
+        test_agents = [tournament.Agent(SortedPlayer(largest=True), "Largest")]
+
+        def play(num_matches, checkpoint=None):
+            wins = {cpu_agent.player: 0, test_agents[0].player: 0}
+            tournament.play_round(cpu_agent, test_agents, wins, num_matches,
+                                  rng=random.Random(1), checkpoint=checkpoint)
+            return wins
+
+        expected = play(2)
+        settings = {"matches": 2, "seed": 1}
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "checkpoint.json")
+
+            # An interrupted run saved the games of the first match
+            play(1, tournament.Checkpoint(path, settings, every=1))
+            checkpoint = tournament.Checkpoint(path, settings, every=1)
+            self.assertEqual(len(checkpoint.get("Smallest")), 2)
+
+            # Resuming only plays the other games
+            with unittest.mock.patch("tournament.play_game",
+                                     wraps=tournament.play_game) as play_game:
+                self.assertEqual(play(2, checkpoint), expected)
+            self.assertEqual(play_game.call_count, 2)
+            checkpoint = tournament.Checkpoint(path, settings)
+            self.assertEqual(len(checkpoint.get("Smallest")), 4)
+
+            with self.assertRaises(ValueError):
+                tournament.Checkpoint(path, dict(settings, matches=3))
+
+    def test_records(self):
+        player1, player2 = RandomPlayer(), GreedyPlayer()
+        opening = [(2, 3), (0, 5)]
+        with tempfile.TemporaryDirectory() as tmp:
+            for name in ("games.jsonl", "games.jsonl.gz"):
+                path = os.path.join(tmp, name)
+                for _ in range(2):
+                    result = tournament.play_game(player1, player2, opening)
+                    with records.RecordWriter(path) as log:
+                        log.write(result[3]._replace(players=["A", "B"]))
+                games = list(records.read_records(path))
+                self.assertEqual(len(games), 2)
+
+        # The record replays to the end of the game
+        record = games[-1]
+        self.assertEqual(record.winner, result[0])
+        self.assertEqual(len(record.times), len(record.moves))
+        game = isolation.Board(player1, player2)
+        for move in record.history():
+            game.apply_move(tuple(move))
+        self.assertFalse(game.get_legal_moves())
+        self.assertEqual(game.active_player,
+                         [player1, player2][1 - record.winner])
+
+    def test_sprt(self):
+        self.assertAlmostEqual(elo_to_score(0), 0.5)
+        self.assertAlmostEqual(score_to_elo(elo_to_score(120)), 120)
+
+        test = SPRT(0, 50)
+        while test.status() is None:
+            test.add(1.)
+        self.assertEqual(test.status(), SPRT.H1)
+        self.assertLess(len(test.scores), 20)
+        self.assertGreater(test.elo()[1], 0)
+
+        test = SPRT(0, 50)
+        for _ in range(2000):
+            test.add(0.5)
+        self.assertEqual(test.status(), SPRT.H0)
+
+    def test_benchmark_compare(self):
+        self.assertEqual(benchmark.make_corpus(), benchmark.make_corpus())
+        baseline = {"a": {"value": 100.}, "b": {"value": 100.},
+                    "c": {"value": 100.}}
+        results = {"a": {"value": 95.}, "b": {"value": 80.},
+                   "d": {"value": 1.}}
+        self.assertEqual(benchmark.compare(baseline, results, 0.1),
+                         [("b", 100., 80.)])
+
     def test_alphabeta(self):
         #player1 = RandomPlayer()
         player1 = game_agent.AlphaBetaPlayer(score_fn=game_agent.custom_score)
@@ -0,0 +1,192 @@
+"""Evaluate the heuristics of `game_agent.py` over batches of positions with
+NumPy.
+
+A batch of n positions of a board with `cells` = width * height cells is
+encoded as:
+
+- `blocked`: bool array (n, cells), True for the blocked cells, where cell
+  (row, column) has index `row + column * height` as in `isolation.Board`
+- `own`, `opp`: int arrays (n,), the cell index of the player the positions
+  are scored for and of its opponent, or -1 before their first move
+- `own_active`: bool array (n,), True where the scored player is to move
+
+`encode()` builds these arrays from boards and `encode_children()` from the
+successors of one board. `BatchEvaluator.features()` computes mobility and
+open-space features of every position at once with a precomputed knight-move
+adjacency matrix, and the `*_score()` methods reproduce the scalar heuristics
+(including their terminal values), so that a search can score all the
+children of a node in one call and offline tuning can score millions of
+positions.
+"""
+import numpy as np
+
+from isolation.isolation import DIRECTIONS
+
+# Columns of the array returned by `BatchEvaluator.features()`
+FEATURES = ("own_moves", "opp_moves", "own_open", "opp_open", "move_count")
+
+
+class BatchEvaluator:
+    """Batched heuristic evaluation for boards of a given size.
+
+    Parameters
+    ----------
+    width, height : int (optional)
+        The size of the boards of the batches.
+    """
+    def __init__(self, width=7, height=7):
+        self.width = width
+        self.height = height
+        self.cells = width * height
+
+        # adjacency[i, j] is True when a knight move leads from cell i to
+        # cell j; the extra last row (index -1) is used for players that
+        # have not moved, who can move to any blank cell
+        idx = np.arange(self.cells)
+        rows, cols = idx % height, idx // height
+        adjacency = np.zeros((self.cells + 1, self.cells), dtype=bool)
+        for dr, dc in DIRECTIONS:
+            r, c = rows + dr, cols + dc
+            valid = (r >= 0) & (r < height) & (c >= 0) & (c < width)
+            adjacency[idx[valid], r[valid] + c[valid] * height] = True
+        adjacency[-1] = True
+        self.adjacency = adjacency
+        self._steps = adjacency[:-1].astype(np.float32)
+
+    def moves(self, blocked, loc):
+        """Return the bool array (n, cells) of the legal moves of the player
+        at the cell indices `loc` (-1 if it has not moved).
+        """
+        return self.adjacency[loc] & ~blocked
+
+    def features(self, blocked, own, opp):
+        """Return the float array (n, len(FEATURES)) of the features of each
+        position: the number of legal moves of each player, the number of
+        blank cells each player can reach in one or two moves, and the number
+        of moves played (i.e., of blocked cells).
+        """
+        free = ~blocked
+        own_moves = self.moves(blocked, own)
+        opp_moves = self.moves(blocked, opp)
+        # Cells one more move away from a legal move (float32 operands let
+        # the matrix product use BLAS)
+        own_open = ((own_moves.astype(np.float32) @ self._steps > 0) & free |
+                    own_moves)
+        opp_open = ((opp_moves.astype(np.float32) @ self._steps > 0) & free |
+                    opp_moves)
+        return np.stack([own_moves.sum(axis=1), opp_moves.sum(axis=1),
+                         own_open.sum(axis=1), opp_open.sum(axis=1),
+                         blocked.sum(axis=1)], axis=1).astype(float)
+
+    def _terminal(self, scores, features, own_active):
+        """Set the scores of the positions where the player to move has no
+        legal moves to -inf (scored player to move) or inf.
+        """
+        lost = own_active & (features[:, 0] == 0)
+        won = ~own_active & (features[:, 1] == 0)
+        scores[lost] = float("-inf")
+        scores[won] = float("inf")
+        return scores
+
+    def improved_score(self, blocked, own, opp, own_active):
+        """Batched `sample_players.improved_score()`. """
+        f = self.features(blocked, own, opp)
+        return self._terminal(f[:, 0] - f[:, 1], f, own_active)
+
+    def custom_score(self, blocked, own, opp, own_active):
+        """Batched `game_agent.custom_score()`. """
+        f = self.features(blocked, own, opp)
+        return self._terminal(f[:, 0] - 1.5 * f[:, 1], f, own_active)
+
+    def custom_score_2(self, blocked, own, opp, own_active):
+        """Batched `game_agent.custom_score_2()`. """
+        f = self.features(blocked, own, opp)
+        scores = (f[:, 0] - 1.5 * f[:, 1]) / (f[:, 4] + 1)
+        return self._terminal(scores, f, own_active)
+
+    def custom_score_3(self, blocked, own, opp, own_active):
+        """Batched `game_agent.custom_score_3()`. """
+        f = self.features(blocked, own, opp)
+        scores = -(f[:, 1] + 0.5) / (f[:, 0] + 0.5) * f[:, 4]
+        return self._terminal(scores, f, own_active)
+
+
+def _index(game, player):
+    """Return the cell index of the player's location, or -1. """
+    loc = game.get_player_location(player)
+    return -1 if loc is None else loc[0] + loc[1] * game.height
+
+
+def encode(games, player=None):
+    """Encode boards of the same size as a batch.
+
+    Parameters
+    ----------
+    games : list<`isolation.Board`>
+        The positions.
+
+    player : object (optional)
+        The player the positions are scored for; None scores each position
+        for its active player.
+
+    Returns
+    -------
+    (np.ndarray, np.ndarray, np.ndarray, np.ndarray)
+        The `blocked`, `own`, `opp` and `own_active` arrays of the batch.
+    """
+    cells = games[0].width * games[0].height
+    blocked = np.ones((len(games), cells), dtype=bool)
+    own = np.empty(len(games), dtype=np.intp)
+    opp = np.empty(len(games), dtype=np.intp)
+    own_active = np.empty(len(games), dtype=bool)
+    for i, game in enumerate(games):
+        scored = game.active_player if player is None else player
+        h = game.height
+        for r, c in game.get_blank_spaces():
+            blocked[i, r + c * h] = False
+        own[i] = _index(game, scored)
+        opp[i] = _index(game, game.get_opponent(scored))
+        own_active[i] = scored == game.active_player
+    return blocked, own, opp, own_active
+
+
+def encode_children(game, moves, player):
+    """Encode the positions reached by each move of the active player as a
+    batch scored for `player`, without creating the boards.
+    """
+    blocked, own, opp, own_active = encode([game], player)
+    n, h = len(moves), game.height
+    idx = np.array([r + c * h for r, c in moves], dtype=np.intp)
+    blocked = np.repeat(blocked, n, axis=0)
+    blocked[np.arange(n), idx] = True
+    own, opp = np.repeat(own, n), np.repeat(opp, n)
+    if own_active[0]:
+        own = idx
+    else:
+        opp = idx
+    return blocked, own, opp, np.repeat(~own_active, n)
+
+
+def score_children(game, player, moves=None, score="custom_score",
+                   evaluator=None):
+    """Score for `player` the position reached by each legal move (or each
+    of `moves`) of the active player with one batched call.
+
+    Parameters
+    ----------
+    score : str (optional)
+        The name of a score method of `BatchEvaluator`.
+
+    Returns
+    -------
+    (list<(int, int)>, np.ndarray)
+        The moves and their scores.
+    """
+    if moves is None:
+        moves = game.get_legal_moves()
+    if not moves:
+        return moves, np.empty(0)
+    if evaluator is None:
+        evaluator = BatchEvaluator(game.width, game.height)
+    batch = encode_children(game, moves, player)
+    return moves, getattr(evaluator, score)(*batch)
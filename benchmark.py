@@ -0,0 +1,400 @@
+"""Benchmark the isolation engine and the search agents.
+
+The micro-benchmarks time the board operations used by the search
+(`Board.copy()`, `forecast_move()`, `get_legal_moves()`, `apply_move()`,
+`hash()`) and each heuristic of `game_agent.py` on a corpus of fixed
+positions. The search benchmarks run fixed-depth minimax and alpha-beta
+searches from the same positions and report the number of nodes searched
+per second.
+
+Results can be saved as JSON and compared with the results of an earlier run
+(e.g., on another commit, on the same machine); the comparison lists every
+benchmark that got slower by more than a threshold, and the script exits
+with status 1 if there is any:
+
+    python benchmark.py --output base.json
+    python benchmark.py --compare base.json --threshold 0.1
+
+Run `python benchmark.py --help` for the other options.
+"""
+import argparse
+import json
+import platform
+import random
+import sys
+import timeit
+
+try:
+    import batch_eval
+except ImportError:  # the batch benchmarks need NumPy
+    batch_eval = None
+from isolation import Board
+from game_agent import (MinimaxPlayer, AlphaBetaPlayer, KillerHistoryOrdering,
+                        custom_score, custom_score_2, custom_score_3)
+
+CORPUS_SEED = 2017  # seed of the random games the positions are taken from
+CORPUS_MOVES = [4, 8, 12, 16, 20, 24]  # move counts of the corpus positions
+CORPUS_GAMES = 2  # number of positions with each move count
+REPEAT = 5  # number of measurements of each micro-benchmark (best is kept)
+MIN_TIME = 0.2  # minimum duration in seconds of each measurement
+THRESHOLD = 0.1  # relative slowdown reported as a regression
+NO_TIME_LIMIT = 1e9  # time limit in milliseconds of the search benchmarks
+ASPIRATION = 1.  # half-width of the aspiration windows of the benchmarks
+BATCH_SIZE = 4096  # number of positions of the batch evaluation benchmarks
+
+
+def make_corpus(width=7, height=7, seed=CORPUS_SEED):
+    """Return a list of positions, taken from random games, where the player
+    to move has legal moves; each position is the list of moves played.
+
+    The games are chosen among the sorted legal moves by a generator with a
+    fixed seed, so the corpus is the same on every run.
+    """
+    rng = random.Random(seed)
+    corpus = []
+    for move_count in CORPUS_MOVES:
+        found = 0
+        while found < CORPUS_GAMES:
+            board = Board("Player 1", "Player 2", width, height)
+            history = []
+            while len(history) < move_count:
+                moves = sorted(board.get_legal_moves())
+                if not moves:
+                    break
+                history.append(rng.choice(moves))
+                board.apply_move(history[-1])
+            if len(history) == move_count and board.get_legal_moves():
+                corpus.append(history)
+                found += 1
+    return corpus
+
+
+def make_board(position, player, opponent="Opponent", width=7, height=7):
+    """Return a board, which does not shuffle its moves (so that searches
+    from it are repeatable), of a corpus position with `player` to move.
+    """
+    if len(position) % 2:
+        board = Board(opponent, player, width, height, shuffle=False)
+    else:
+        board = Board(player, opponent, width, height, shuffle=False)
+    for move in position:
+        board.apply_move(move)
+    return board
+
+
+def time_per_call(run, repeat=REPEAT, min_time=MIN_TIME):
+    """Return the time in seconds of a call of `run(number)`, divided by
+    `number`; `number` is doubled until a call takes at least `min_time`
+    seconds, then the best of `repeat` calls is kept.
+    """
+    number = 1
+    while run(number) < min_time:
+        number *= 2
+    return min(run(number) for _ in range(repeat)) / number
+
+
+def micro_benchmarks(corpus, repeat=REPEAT):
+    """Time the board operations and the heuristics on every position of
+    the corpus (see `make_corpus()`).
+
+    Returns
+    -------
+    dict
+        Maps each benchmark name to a result {"value": calls per second,
+        "unit": "calls/s"}.
+    """
+    player = "Player"
+    corpus = [make_board(position, player) for position in corpus]
+    moves = [board.get_legal_moves()[0] for board in corpus]
+
+    def each_position(fn):
+        def run(number):
+            start = timeit.default_timer()
+            for _ in range(number):
+                for board, move in zip(corpus, moves):
+                    fn(board, move)
+            return timeit.default_timer() - start
+        return run
+
+    def uncached_legal_moves(board, move):
+        # discard the memoized moves, as a newly applied move does
+        board._p1_moves = board._p2_moves = None
+        board.get_legal_moves()
+
+    def apply_move(number):
+        # apply_move() changes the board, so it runs on prepared copies; the
+        # copies are made outside of the timed loop
+        copies = [(board.copy(), move) for _ in range(number)
+                  for board, move in zip(corpus, moves)]
+        start = timeit.default_timer()
+        for board, move in copies:
+            board.apply_move(move)
+        return timeit.default_timer() - start
+
+    benchmarks = [
+        ("board.copy", each_position(lambda b, m: b.copy())),
+        ("board.forecast_move", each_position(lambda b, m: b.forecast_move(m))),
+        ("board.get_legal_moves", each_position(uncached_legal_moves)),
+        ("board.get_legal_moves_cached",
+         each_position(lambda b, m: b.get_legal_moves())),
+        ("board.hash", each_position(lambda b, m: b.hash())),
+        ("board.apply_move", apply_move),
+    ]
+    for score_fn in [custom_score, custom_score_2, custom_score_3]:
+        benchmarks.append((
+            "score." + score_fn.__name__,
+            each_position(lambda b, m, fn=score_fn: fn(b, player))))
+
+    results = {}
+    for name, run in benchmarks:
+        seconds = time_per_call(run, repeat) / len(corpus)
+        results[name] = {"value": 1. / seconds, "unit": "calls/s"}
+    if batch_eval is not None:
+        results.update(batch_benchmarks(corpus, player, repeat))
+    return results
+
+
+def batch_benchmarks(corpus, player, repeat=REPEAT):
+    """Time the batched heuristics of `batch_eval` on BATCH_SIZE positions
+    taken from the corpus boards, and the batched scoring of the children of
+    each corpus position.
+
+    Returns
+    -------
+    dict
+        Maps each benchmark name to a result {"value": positions per second,
+        "unit": "positions/s"}.
+    """
+    evaluator = batch_eval.BatchEvaluator(corpus[0].width, corpus[0].height)
+    batch = batch_eval.encode(corpus, player)
+    reps = -(-BATCH_SIZE // len(corpus))
+    batch = [array.repeat(reps, axis=0)[:BATCH_SIZE] for array in batch]
+
+    def batched(name):
+        fn = getattr(evaluator, name)
+
+        def run(number):
+            start = timeit.default_timer()
+            for _ in range(number):
+                fn(*batch)
+            return timeit.default_timer() - start
+        return run
+
+    def children(number):
+        start = timeit.default_timer()
+        for _ in range(number):
+            for board in corpus:
+                batch_eval.score_children(board, player, evaluator=evaluator)
+        return timeit.default_timer() - start
+
+    results = {}
+    for name in ["custom_score", "custom_score_2", "custom_score_3"]:
+        seconds = time_per_call(batched(name), repeat) / BATCH_SIZE
+        results["batch." + name] = {"value": 1. / seconds,
+                                    "unit": "positions/s"}
+    positions = sum(len(board.get_legal_moves()) for board in corpus)
+    seconds = time_per_call(children, repeat) / positions
+    results["batch.score_children"] = {"value": 1. / seconds,
+                                       "unit": "positions/s"}
+    return results
+
+
+def search_agents():
+    """Return the (name, player, search function) of the agents of the
+    search benchmarks.
+    """
+    ab_tt = AlphaBetaPlayer(in_place=True, tt_size_mb=16,
+                            move_ordering=KillerHistoryOrdering())
+    return [
+        ("minimax", MinimaxPlayer(), MinimaxPlayer.minimax),
+        ("alphabeta", AlphaBetaPlayer(), AlphaBetaPlayer.alphabeta),
+        ("alphabeta_in_place", AlphaBetaPlayer(in_place=True),
+         AlphaBetaPlayer.alphabeta),
+        ("alphabeta_tt_ordering", ab_tt, AlphaBetaPlayer.alphabeta),
+    ]
+
+
+def search_benchmarks(corpus, depth=5, minimax_depth=3):
+    """Run a fixed-depth search from every position of the corpus with each
+    agent of `search_agents()`, without a time limit.
+
+    Returns
+    -------
+    dict
+        Maps each benchmark name to a result {"value": nodes per second,
+        "unit": "nodes/s", "nodes": total number of nodes, "seconds": total
+        time}.
+    """
+    results = {}
+    for name, player, search in search_agents():
+        # the same kind of clock as the one given by `Board.play()`, with a
+        # time limit that is never reached
+        start = timeit.default_timer()
+        player.time_left = lambda: NO_TIME_LIMIT - (
+            1000 * timeit.default_timer() - 1000 * start)
+        search_depth = minimax_depth if name == "minimax" else depth
+        nodes = 0
+        seconds = 0.
+        for position in corpus:
+            board = make_board(position, player)
+            if getattr(player, "tt", None) is not None:
+                player.tt.clear()
+            if getattr(player, "move_ordering", None) is not None:
+                player.move_ordering.new_search()
+            before = player.nodes
+            begin = timeit.default_timer()
+            search(player, board, search_depth)
+            seconds += timeit.default_timer() - begin
+            nodes += player.nodes - before
+        results["search.{}_d{}".format(name, search_depth)] = {
+            "value": nodes / seconds, "unit": "nodes/s", "nodes": nodes,
+            "seconds": seconds}
+    return results
+
+
+def deepening_agents():
+    """Return the (name, player) of the agents of the iterative deepening
+    benchmarks: the root window and node search variants of alpha-beta, with
+    a transposition table and killer/history move ordering.
+    """
+    def player(**kwargs):
+        return AlphaBetaPlayer(in_place=True, tt_size_mb=16,
+                               move_ordering=KillerHistoryOrdering(), **kwargs)
+    return [
+        ("alphabeta", player()),
+        ("pvs", player(pvs=True)),
+        ("aspiration", player(aspiration=ASPIRATION)),
+        ("pvs_aspiration", player(pvs=True, aspiration=ASPIRATION)),
+    ]
+
+
+def deepening_benchmarks(corpus, depth=8):
+    """Run iterative deepening up to a fixed depth from every position of
+    the corpus with each agent of `deepening_agents()`.
+
+    Returns
+    -------
+    dict
+        Maps each benchmark name to a result {"value": nodes per second,
+        "unit": "nodes/s", "nodes": total number of nodes, "researches":
+        total number of searches repeated after a window failure,
+        "seconds": total time}.
+    """
+    results = {}
+    for name, player in deepening_agents():
+        start = timeit.default_timer()
+        player.time_left = lambda: NO_TIME_LIMIT - (
+            1000 * timeit.default_timer() - 1000 * start)
+        nodes = 0
+        researches = player.researches
+        seconds = 0.
+        for position in corpus:
+            board = make_board(position, player)
+            player.new_game()
+            player.tt.new_search()
+            player.move_ordering.new_search()
+            player._pv_move = None
+            player.depth_completed = 0
+            before = player.nodes
+            begin = timeit.default_timer()
+            player.iterative_deepening(board, board.get_legal_moves()[0],
+                                       max_depth=depth)
+            seconds += timeit.default_timer() - begin
+            nodes += player.nodes - before
+        results["deepening.{}_d{}".format(name, depth)] = {
+            "value": nodes / seconds, "unit": "nodes/s", "nodes": nodes,
+            "researches": player.researches - researches, "seconds": seconds}
+    return results
+
+
+def compare(baseline, results, threshold=THRESHOLD):
+    """Compare results with the results of an earlier run; higher values
+    are better.
+
+    Returns
+    -------
+    list<(str, float, float)>
+        The name and the baseline and current values of every benchmark
+        present in both runs whose value dropped by more than `threshold`
+        (a fraction of the baseline value).
+    """
+    regressions = []
+    for name in sorted(set(baseline) & set(results)):
+        old, new = baseline[name]["value"], results[name]["value"]
+        if new < old * (1. - threshold):
+            regressions.append((name, old, new))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description=__doc__,
+        formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("-o", "--output", metavar="PATH",
+                        help="save the results to a JSON file")
+    parser.add_argument("-c", "--compare", metavar="PATH",
+                        help="compare the results with a saved JSON file")
+    parser.add_argument("--threshold", type=float, default=THRESHOLD,
+                        help="relative slowdown reported as a regression "
+                             "(default: %(default)s)")
+    parser.add_argument("-d", "--depth", type=int, default=5,
+                        help="alpha-beta search depth (default: %(default)s)")
+    parser.add_argument("--deepening-depth", type=int, default=8,
+                        help="last depth of the iterative deepening searches "
+                             "(default: %(default)s)")
+    parser.add_argument("-r", "--repeat", type=int, default=REPEAT,
+                        help="measurements of each micro-benchmark "
+                             "(default: %(default)s)")
+    parser.add_argument("--skip-micro", action="store_true",
+                        help="only run the search benchmarks")
+    parser.add_argument("--skip-search", action="store_true",
+                        help="only run the micro-benchmarks")
+    args = parser.parse_args(argv)
+
+    baseline = None
+    if args.compare:
+        try:
+            with open(args.compare) as f:
+                baseline = json.load(f)["results"]
+        except (OSError, ValueError, KeyError) as e:
+            parser.error("cannot read {}: {}".format(args.compare, e))
+
+    corpus = make_corpus()
+    results = {}
+    if not args.skip_micro:
+        results.update(micro_benchmarks(corpus, args.repeat))
+    if not args.skip_search:
+        results.update(search_benchmarks(corpus, args.depth))
+        results.update(deepening_benchmarks(corpus, args.deepening_depth))
+
+    print("{:<40}{:>16}".format("Benchmark", "Value"))
+    for name in sorted(results):
+        line = "{:<40}{:>16,.0f} {}".format(name, results[name]["value"],
+                                            results[name]["unit"])
+        if "nodes" in results[name]:
+            line += "  {:>9,} nodes".format(results[name]["nodes"])
+        if baseline is not None and name in baseline:
+            line += "  {:+.1%}".format(
+                results[name]["value"] / baseline[name]["value"] - 1.)
+        print(line)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"python": platform.python_version(),
+                       "machine": platform.platform(),
+                       "corpus_size": len(corpus),
+                       "results": results}, f, indent=2, sort_keys=True)
+
+    if baseline is not None:
+        regressions = compare(baseline, results, args.threshold)
+        if regressions:
+            print("\n{} regression(s) beyond {:.0%}:".format(
+                len(regressions), args.threshold))
+            for name, old, new in regressions:
+                print("  {}: {:,.0f} -> {:,.0f}".format(name, old, new))
+            sys.exit(1)
+        print("\nNo regression beyond {:.0%}.".format(args.threshold))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+"""Build an opening book for `AlphaBetaPlayer` by searching the early
+positions of a board size offline.
+
+Every position reachable in the first PLIES moves (one position for each
+set of symmetric positions, see `game_agent.OpeningBook`) is searched with
+iterative deepening to a fixed depth, and the best move is stored in a book
+file that the agent loads at construction:
+
+    python book.py --output book.bin --plies 3 --depth 9
+
+`book.bin` is the book of the `AB_Book` tournament agent; other agents can
+use a book with `AlphaBetaPlayer(book="book.bin")`.
+
+Run `python book.py --help` for the other options.
+"""
+import argparse
+import timeit
+
+from isolation import Board
+from game_agent import (AlphaBetaPlayer, KillerHistoryOrdering, OpeningBook,
+                        custom_score)
+
+PLIES = 3  # number of moves from the empty board covered by the book
+DEPTH = 9  # depth of the search of each book position
+NO_TIME_LIMIT = 1e9  # time limit in milliseconds of the book searches
+
+
+def make_searcher(score_fn=custom_score):
+    """Return an `AlphaBetaPlayer` set up for fixed-depth book searches. """
+    player = AlphaBetaPlayer(score_fn=score_fn, tt_size_mb=16,
+                             move_ordering=KillerHistoryOrdering(), pvs=True,
+                             endgame_solver=False)
+    player.time_left = lambda: NO_TIME_LIMIT
+    return player
+
+
+def search(player, game, depth):
+    """Return the best move of the active player (`player`) found by
+    iterative deepening to the given depth.
+    """
+    player.search_depth = 1
+    player.depth_completed = 0
+    player.tt.new_search()
+    player.move_ordering.new_search()
+    player._pv_move = None
+    return player.iterative_deepening(game, game.get_legal_moves()[0],
+                                      max_depth=depth)
+
+
+def build(width=7, height=7, plies=PLIES, depth=DEPTH, score_fn=custom_score,
+          verbose=False):
+    """Return an `OpeningBook` of the best moves of the positions reached
+    after 0 to `plies` - 1 moves on a board of the given size.
+    """
+    book = OpeningBook(width, height)
+    players = [make_searcher(score_fn), make_searcher(score_fn)]
+    positions = [Board(players[0], players[1], width, height, shuffle=False)]
+    for ply in range(plies):
+        start = timeit.default_timer()
+        for game in positions:
+            book.add(game, search(game.active_player, game, depth))
+        if verbose:
+            print("ply {}: {} positions in {:.1f}s".format(
+                ply, len(positions), timeit.default_timer() - start))
+        if ply + 1 == plies:
+            break
+
+        # Keep one position from each set of symmetric successors
+        successors = {}
+        for game in positions:
+            for move in game.get_legal_moves():
+                child = game.forecast_move(move)
+                if child.get_legal_moves():
+                    successors.setdefault(child.canonical_hash(), child)
+        positions = list(successors.values())
+    return book
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description=__doc__,
+        formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("-o", "--output", metavar="PATH", required=True,
+                        help="path of the book file to write")
+    parser.add_argument("--width", type=int, default=7,
+                        help="board width (default: %(default)s)")
+    parser.add_argument("--height", type=int, default=7,
+                        help="board height (default: %(default)s)")
+    parser.add_argument("-p", "--plies", type=int, default=PLIES,
+                        help="number of moves covered by the book "
+                             "(default: %(default)s)")
+    parser.add_argument("-d", "--depth", type=int, default=DEPTH,
+                        help="search depth of each position "
+                             "(default: %(default)s)")
+    args = parser.parse_args(argv)
+
+    book = build(args.width, args.height, args.plies, args.depth,
+                 verbose=True)
+    book.save(args.output)
+    print("{} positions written to {}".format(len(book), args.output))
+
+
+if __name__ == "__main__":
+    main()
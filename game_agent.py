@@ -2,7 +2,10 @@
 test your agent's strength against a set of known agents using tournament.py
 and include the results in your report.
 """
+import math
 import random
+from array import array
+from collections import namedtuple
 
 
 class SearchTimeout(Exception):
@@ -10,6 +13,49 @@ class SearchTimeout(Exception):
     pass
 
 
+TIMER_CHECKS = 10  # clock checks per TIMER_THRESHOLD milliseconds of search
+NULL_WINDOW = 1e-6  # width of the windows of principal variation search tests
+MAX_CHECK_NODES = 128  # maximum number of nodes between two clock checks
+BOOK_MAGIC = b"ISOBOOK2"  # first bytes of an opening book file
+BOOK_BOM = 0x0102030405060708  # byte order mark of opening book files
+# (row, column) offsets of the knight moves, in the order of the legal moves
+# of `isolation.Board` (repeated here to keep this file self-contained)
+DIRECTIONS = [(-2, -1), (-2, 1), (-1, -2), (-1, 2),
+              (1, -2), (1, 2), (2, -1), (2, 1)]
+
+
+# Search statistics of a single get_move() call
+MoveStats = namedtuple("MoveStats", ["move_count", "nodes", "leaves",
+                                     "cutoffs", "depth", "time_used"])
+
+
+def record_stats(get_move):
+    """Decorate the `get_move()` method of an `IsolationPlayer` so that the
+    statistics of each search are appended to the player's `game_stats`.
+    """
+    def wrapper(self, game, time_left):
+        start = time_left()
+        self._start_move(game)
+        move = get_move(self, game, time_left)
+        self._finish_move(move, start - time_left())
+        return move
+
+    wrapper.__name__ = get_move.__name__
+    wrapper.__doc__ = get_move.__doc__
+    return wrapper
+
+
+def count_moves(game, player):
+    """Return the number of legal moves of the player, with
+    `Board.count_legal_moves()` on boards that have it (the stock board of
+    the project reviewers does not).
+    """
+    count_legal_moves = getattr(game, "count_legal_moves", None)
+    if count_legal_moves is None:
+        return len(game.get_legal_moves(player))
+    return count_legal_moves(player)
+
+
 def custom_score(game, player):
     """Calculate the heuristic value of a game state from the point of view
     of the given player.
@@ -37,8 +83,8 @@ def custom_score(game, player):
     if game.is_winner(player) or game.is_loser(player):
         return game.utility(player)
 
-    own_moves = len(game.get_legal_moves(player))
-    opp_moves = len(game.get_legal_moves(game.get_opponent(player)))
+    own_moves = count_moves(game, player)
+    opp_moves = count_moves(game, game.get_opponent(player))
     return float(own_moves - 1.5*opp_moves)
 
 def custom_score_2(game, player):
@@ -66,8 +112,8 @@ def custom_score_2(game, player):
     if game.is_winner(player) or game.is_loser(player):
         return game.utility(player)
 
-    own_moves = len(game.get_legal_moves(player))
-    opp_moves = len(game.get_legal_moves(game.get_opponent(player)))
+    own_moves = count_moves(game, player)
+    opp_moves = count_moves(game, game.get_opponent(player))
     return float((own_moves - 1.5*opp_moves)/(game.move_count + 1))
 
 def custom_score_3(game, player):
@@ -95,9 +141,10 @@ def custom_score_3(game, player):
     if game.is_winner(player) or game.is_loser(player):
         return game.utility(player)
 
-    own_moves = len(game.get_legal_moves(player))
-    opp_moves = len(game.get_legal_moves(game.get_opponent(player)))
-    close_spaces = game.height * game.width - len(game.get_blank_spaces())
+    own_moves = count_moves(game, player)
+    opp_moves = count_moves(game, game.get_opponent(player))
+    # Every move blocks exactly one cell
+    close_spaces = game.move_count
     if player == game.inactive_player and opp_moves == 0:
         return float("inf")
     if player == game.active_player and own_moves == 0:
@@ -105,6 +152,423 @@ def custom_score_3(game, player):
 
     return -(opp_moves + 0.5) / (own_moves + 0.5) * close_spaces
 
+class TranspositionTable:
+    """Fixed-capacity transposition table for alpha-beta search keyed on the
+    64-bit Zobrist hash returned by `isolation.Board.hash()`.
+
+    Each slot holds at most one entry (key, depth, bound type, value, best
+    move, generation); the slot for a position is chosen by its key modulo
+    the table capacity.
+
+    Parameters
+    ----------
+    size_mb : float (optional)
+        Approximate memory budget of the table in megabytes.
+
+    policy : str (optional)
+        Replacement policy when two positions share a slot: "depth" keeps the
+        entry searched to the greater depth (entries left over from earlier
+        searches are always replaced), "always" overwrites the old entry.
+    """
+    EXACT, LOWER, UPPER = 0, 1, 2
+
+    # Approximate memory used by one slot and the entry tuple it points to
+    ENTRY_BYTES = 160
+
+    def __init__(self, size_mb=16, policy="depth"):
+        if policy not in ("depth", "always"):
+            raise ValueError("Unknown replacement policy: {}".format(policy))
+        self.capacity = max(1, int(size_mb * 2**20) // self.ENTRY_BYTES)
+        self.policy = policy
+        self.clear()
+
+    def clear(self):
+        """Remove every entry and reset the counters. """
+        self._slots = [None] * self.capacity
+        self.generation = 0
+        self.reset_stats()
+
+    def reset_stats(self):
+        """Reset the probe, hit, cutoff and store counters. """
+        self.probes = 0
+        self.hits = 0
+        self.cutoffs = 0
+        self.stores = 0
+        self.replacements = 0
+
+    def new_search(self):
+        """Mark the entries stored so far as belonging to an earlier search,
+        so the depth-preferred policy lets newer entries replace them.
+        """
+        self.generation += 1
+
+    def probe(self, key):
+        """Return the entry stored for the key, or None.
+
+        Returns
+        -------
+        tuple or None
+            An entry (key, depth, flag, value, move, generation), where flag
+            is one of EXACT, LOWER or UPPER.
+        """
+        self.probes += 1
+        entry = self._slots[key % self.capacity]
+        if entry is not None and entry[0] == key:
+            self.hits += 1
+            return entry
+        return None
+
+    def store(self, key, depth, flag, value, move):
+        """Store the result of searching a position to the given depth,
+        subject to the replacement policy.
+        """
+        idx = key % self.capacity
+        entry = self._slots[idx]
+        if entry is not None and entry[0] != key:
+            if (self.policy == "depth" and entry[5] == self.generation and
+                    entry[1] > depth):
+                return
+            self.replacements += 1
+        self._slots[idx] = (key, depth, flag, value, move, self.generation)
+        self.stores += 1
+
+    def stats(self):
+        """Return a dictionary of the table counters, including the hit rate
+        (hits per probe) and the number of cutoffs taken from table entries.
+        """
+        return {"capacity": self.capacity,
+                "probes": self.probes,
+                "hits": self.hits,
+                "hit_rate": self.hits / self.probes if self.probes else 0.,
+                "cutoffs": self.cutoffs,
+                "stores": self.stores,
+                "replacements": self.replacements}
+
+
+class MoveOrdering:
+    """Base move ordering for alpha-beta search: moves are searched in the
+    order returned by `Board.get_legal_moves()`.
+
+    Ordering strategies subclass this class and override `order()` and
+    `record()`. The base class also keeps the counters used to compare
+    strategies: the effective branching factor (moves searched per expanded
+    node) and the fraction of cutoffs produced by the first move searched.
+    """
+    def __init__(self):
+        self.reset_stats()
+
+    def reset_stats(self):
+        """Reset the node, move and cutoff counters. """
+        self.nodes = 0
+        self.moves_searched = 0
+        self.cutoffs = 0
+        self.first_move_cutoffs = 0
+
+    def new_search(self):
+        """Prepare for the search of a new root position. """
+        pass
+
+    def order(self, moves, ply, hint=None):
+        """Return the moves of a node in the order they should be searched.
+
+        Parameters
+        ----------
+        moves : list<(int, int)>
+            The legal moves of the node.
+
+        ply : int
+            The distance of the node from the root of the search.
+
+        hint : (int, int) or None
+            The best move found by an earlier search of the node (e.g., the
+            principal variation or transposition table move), if any.
+        """
+        return moves
+
+    def record(self, ply, depth, move, searched, cutoff):
+        """Update the ordering state once a node has been searched.
+
+        Parameters
+        ----------
+        ply : int
+            The distance of the node from the root of the search.
+
+        depth : int
+            The remaining search depth of the node.
+
+        move : (int, int)
+            The best move of the node (the refutation if `cutoff` is True).
+
+        searched : int
+            The number of moves searched before returning.
+
+        cutoff : bool
+            True if the node failed high (or low) and skipped the rest of
+            its moves.
+        """
+        self.nodes += 1
+        self.moves_searched += searched
+        if cutoff:
+            self.cutoffs += 1
+            if searched == 1:
+                self.first_move_cutoffs += 1
+
+    def stats(self):
+        """Return a dictionary of the counters, the effective branching
+        factor and the first-move cutoff rate.
+        """
+        return {"nodes": self.nodes,
+                "cutoffs": self.cutoffs,
+                "branching_factor": (self.moves_searched / self.nodes
+                                     if self.nodes else 0.),
+                "first_move_cutoff_rate": (self.first_move_cutoffs / self.cutoffs
+                                           if self.cutoffs else 0.)}
+
+
+class KillerHistoryOrdering(MoveOrdering):
+    """Move ordering that searches the hint move first (principal variation
+    or transposition table move), then the killer moves of the ply, then the
+    remaining moves ranked by the history heuristic.
+
+    Parameters
+    ----------
+    num_killers : int (optional)
+        The number of killer moves remembered for each ply.
+    """
+    # Sort keys that rank above any history score
+    HINT_KEY = 1 << 62
+    KILLER_KEY = 1 << 61
+
+    def __init__(self, num_killers=2):
+        super().__init__()
+        self.num_killers = num_killers
+        self.killers = {}
+        self.history = ({}, {})
+
+    def new_search(self):
+        # Plies are counted from the new root, so the killers no longer
+        # line up, but the history scores are aged and kept
+        self.killers = {}
+        for table in self.history:
+            for move in table:
+                table[move] >>= 1
+
+    def order(self, moves, ply, hint=None):
+        killers = self.killers.get(ply, ())
+        history = self.history[ply & 1]
+
+        def key(move):
+            if move == hint:
+                return self.HINT_KEY
+            if move in killers:
+                return self.KILLER_KEY - killers.index(move)
+            return history.get(move, 0)
+
+        return sorted(moves, key=key, reverse=True)
+
+    def record(self, ply, depth, move, searched, cutoff):
+        super().record(ply, depth, move, searched, cutoff)
+        if not cutoff:
+            return
+
+        killers = self.killers.setdefault(ply, [])
+        if move not in killers:
+            killers.insert(0, move)
+            del killers[self.num_killers:]
+
+        history = self.history[ply & 1]
+        history[move] = history.get(move, 0) + depth * depth
+
+
+class TimeManager:
+    """Time management of iterative deepening: decide whether to start the
+    next iteration, and what to do with an iteration cut by the timer.
+
+    The cost of the next iteration is predicted from the time of the last
+    one and the effective branching factor of the iterations, measured as
+    the ratio of their node counts (over two plies when possible, to smooth
+    the odd/even effect of alpha-beta). An iteration that is not predicted
+    to finish in the time left is not started.
+
+    Parameters
+    ----------
+    safety : float (optional)
+        Factor applied to the predicted time of the next iteration before
+        comparing it to the time left.
+
+    partial_results : bool (optional)
+        If True, an iteration cut by the timer after the best move of the
+        previous iteration has been searched still returns its best move so
+        far (which scored at least as well at the deeper depth).
+    """
+    def __init__(self, safety=1., partial_results=True):
+        self.safety = safety
+        self.partial_results = partial_results
+        self.nodes = []
+        self.times = []
+        self.reset_stats()
+
+    def reset_stats(self):
+        """Reset the iteration counters. """
+        self.searches = 0
+        self.iterations = 0
+        self.skipped = 0
+        self.aborted = 0
+        self.partial = 0
+        self.wasted_nodes = 0
+
+    def new_search(self):
+        """Forget the iterations of the previous search. """
+        self.searches += 1
+        self.nodes = []
+        self.times = []
+
+    def branching_factor(self):
+        """Return the effective branching factor of the iterations so far,
+        or None before the second iteration.
+        """
+        nodes = self.nodes
+        if len(nodes) >= 3 and nodes[-3] > 0:
+            return (nodes[-1] / nodes[-3]) ** 0.5
+        if len(nodes) >= 2 and nodes[-2] > 0:
+            return nodes[-1] / nodes[-2]
+        return None
+
+    def predict(self):
+        """Return the predicted time in milliseconds of the next iteration
+        (0 while there is no estimate of the branching factor).
+        """
+        ebf = self.branching_factor()
+        if ebf is None:
+            return 0.
+        return self.times[-1] * ebf
+
+    def can_start(self, time_available):
+        """Return True if the next iteration is predicted to finish in
+        `time_available` milliseconds.
+        """
+        if self.safety * self.predict() <= time_available:
+            return True
+        self.skipped += 1
+        return False
+
+    def record(self, nodes, elapsed):
+        """Record the node count and time (in milliseconds) of a completed
+        iteration.
+        """
+        self.iterations += 1
+        self.nodes.append(nodes)
+        self.times.append(elapsed)
+
+    def abort(self, nodes, partial):
+        """Record an iteration cut by the timer after searching `nodes`
+        nodes, and whether its partial result was used.
+        """
+        self.aborted += 1
+        if partial:
+            self.partial += 1
+        else:
+            self.wasted_nodes += nodes
+
+    def stats(self):
+        """Return a dictionary of the counters. """
+        return {"searches": self.searches,
+                "iterations": self.iterations,
+                "skipped": self.skipped,
+                "aborted": self.aborted,
+                "partial": self.partial,
+                "wasted_nodes": self.wasted_nodes}
+
+
+class OpeningBook:
+    """Best moves of early positions, computed offline by deep searches (see
+    `book.py`) and stored in a compact binary file.
+
+    Positions are keyed on `isolation.Board.canonical()`, so all the
+    rotations and reflections of a position share one entry; moves are
+    stored in the canonical orientation and mapped back to the orientation
+    of the probed board.
+
+    Parameters
+    ----------
+    width, height : int (optional)
+        The size of the board the book is for.
+    """
+    def __init__(self, width=7, height=7):
+        self.width = width
+        self.height = height
+        self._moves = {}
+
+    def __len__(self):
+        return len(self._moves)
+
+    def __contains__(self, game):
+        return game.canonical_hash() in self._moves
+
+    def add(self, game, move):
+        """Store the best move of the active player in the position. """
+        key, symmetry = game.canonical()
+        move = game.to_canonical(move, symmetry)
+        self._moves[key] = move[0] + move[1] * self.height
+
+    def probe(self, game):
+        """Return the best move stored for the position, in the orientation
+        of `game`, or None if the position is not in the book.
+        """
+        if (game.width, game.height) != (self.width, self.height):
+            return None
+        key, symmetry = game.canonical()
+        idx = self._moves.get(key)
+        if idx is None:
+            return None
+        return game.from_canonical((idx % self.height, idx // self.height),
+                                   symmetry)
+
+    def save(self, path):
+        """Write the book to a binary file: the `BOOK_MAGIC` bytes, then the
+        64-bit words (byte order mark, width, height, number of entries), the
+        sorted 64-bit keys and one byte per entry for the cell index of the
+        move, all in the native byte order.
+        """
+        keys = sorted(self._moves)
+        header = array("Q", [BOOK_BOM, self.width, self.height, len(keys)])
+        with open(path, "wb") as f:
+            f.write(BOOK_MAGIC)
+            f.write(header.tobytes())
+            f.write(array("Q", keys).tobytes())
+            f.write(array("B", [self._moves[key] for key in keys]).tobytes())
+
+    @classmethod
+    def load(cls, path):
+        """Read a book written by `save()`. """
+        with open(path, "rb") as f:
+            data = f.read()
+        if data[:len(BOOK_MAGIC)] != BOOK_MAGIC:
+            raise ValueError("Not an opening book file: {}".format(path))
+        offset = len(BOOK_MAGIC)
+        header = array("Q")
+        header.frombytes(data[offset:offset + 4 * header.itemsize])
+        swap = header[0] != BOOK_BOM
+        if swap:
+            header.byteswap()
+        _, width, height, count = header
+        offset += 4 * header.itemsize
+
+        keys = array("Q")
+        keys.frombytes(data[offset:offset + count * keys.itemsize])
+        if swap:
+            keys.byteswap()
+        offset += count * keys.itemsize
+        moves = array("B")
+        moves.frombytes(data[offset:offset + count])
+        if len(keys) != count or len(moves) != count:
+            raise ValueError("Truncated opening book file: {}".format(path))
+
+        book = cls(width, height)
+        book._moves = dict(zip(keys, moves))
+        return book
+
+
 class IsolationPlayer:
     """Base class for minimax and alphabeta agents -- this class is never
     constructed or tested directly.
@@ -126,13 +590,96 @@ class IsolationPlayer:
         Time remaining (in milliseconds) when search is aborted. Should be a
         positive value large enough to allow the function to return before the
         timer expires.
+
+    in_place : bool (optional)
+        If True, search by applying and undoing moves on a single working
+        board with `Board.push()`/`Board.pop()` instead of creating a new
+        board with `Board.forecast_move()` at every node.
     """
-    def __init__(self, search_depth=3, score_fn=custom_score, timeout=10.):
+    def __init__(self, search_depth=3, score_fn=custom_score, timeout=10.,
+                 in_place=False):
         self.search_depth = search_depth
         self.score = score_fn
         self.time_left = None
         self.TIMER_THRESHOLD = timeout
         self.debug_mode = False
+        self.in_place = in_place
+
+        # Search counters of the current move, and the record of every move
+        # of the current game (see `MoveStats`)
+        self.nodes = 0
+        self.leaves = 0
+        self.cutoffs = 0
+        self.depth_completed = 0
+        self.game_stats = []
+        self._last_move_count = -1
+        self._last_move = None
+
+        # Node count of the next clock check (see `_check_time()`)
+        self._next_check = 0
+        self._check_nodes = 1
+        self._last_check = None
+
+    def new_game(self):
+        """Discard the state kept from the previous game. This is called
+        automatically when `get_move()` is given a board from a new game.
+        """
+        self.game_stats = []
+
+    def _start_move(self, game):
+        """Reset the search counters, and start a new game record unless the
+        board continues the game of the previous move.
+        """
+        # Within a game the move count only grows and the player is still
+        # standing where its previous move took it
+        if (game.move_count <= self._last_move_count or
+                game.get_player_location(self) != self._last_move):
+            self.new_game()
+        self._last_move_count = game.move_count
+
+        self.nodes = 0
+        self.leaves = 0
+        self.cutoffs = 0
+        self.depth_completed = 0
+        self._next_check = 0
+        self._check_nodes = 1
+        self._last_check = None
+
+    def _check_time(self):
+        """Raise `SearchTimeout` if the search must stop, and schedule the
+        next clock check.
+
+        Reading the clock is a noticeable part of the cost of a node, so the
+        search only calls this method at the root and when `self.nodes`
+        reaches `self._next_check`. The number of nodes between two checks follows
+        the node rate measured since the previous check, so that the clock
+        is read about every `TIMER_THRESHOLD / TIMER_CHECKS` milliseconds;
+        the search stops while at least TIMER_THRESHOLD milliseconds are
+        left at the next check.
+        """
+        time_left = self.time_left()
+        period = self.TIMER_THRESHOLD / TIMER_CHECKS
+        if time_left < self.TIMER_THRESHOLD + period:
+            raise SearchTimeout()
+
+        # Grow the interval at most twofold, as the rate of a few nodes is
+        # a rough estimate; the clock may also have been replaced (elapsed
+        # time <= 0), in which case the interval is kept
+        if self._last_check is not None:
+            elapsed = self._last_check - time_left
+            if elapsed > 0:
+                self._check_nodes = max(1, min(
+                    2 * self._check_nodes, MAX_CHECK_NODES,
+                    int(self._check_nodes * period / elapsed)))
+        self._last_check = time_left
+        self._next_check = self.nodes + self._check_nodes
+
+    def _finish_move(self, move, time_used):
+        """Append the statistics of the search that selected `move`. """
+        self._last_move = move
+        self.game_stats.append(MoveStats(self._last_move_count, self.nodes,
+                                         self.leaves, self.cutoffs,
+                                         self.depth_completed, time_used))
 
 
 class MinimaxPlayer(IsolationPlayer):
@@ -141,6 +688,7 @@ class MinimaxPlayer(IsolationPlayer):
     minimax to return a good move before the search time limit expires.
     """
 
+    @record_stats
     def get_move(self, game, time_left):
         """Search for the best move from the available legal moves and return a
         result before the time limit expires.
@@ -178,7 +726,9 @@ class MinimaxPlayer(IsolationPlayer):
         try:
             # The try/except block will automatically catch the exception
             # raised when the timer is about to expire.
-            return self.minimax(game, self.search_depth)
+            best_move = self.minimax(game, self.search_depth)
+            self.depth_completed = self.search_depth
+            return best_move
 
         except SearchTimeout:
             pass  # Handle any actions required after timeout as needed
@@ -209,16 +759,30 @@ class MinimaxPlayer(IsolationPlayer):
             The maximum heuristic value of the current game state to my agent;
 
         """
-        if self.time_left() < self.TIMER_THRESHOLD:
-            raise SearchTimeout()
+        self.nodes += 1
+        if self.nodes >= self._next_check:
+            self._check_time()
+
+        # Leaves are scored without generating their moves; the score
+        # functions detect terminal states themselves
+        if depth <= 0:
+            self.leaves += 1
+            return self.score(game, self)
 
         legal_moves = game.get_legal_moves()
-        if not legal_moves or depth <= 0:
+        if not legal_moves:
+            self.leaves += 1
             return self.score(game, self)
 
         best_score = float("-inf")
         for move in legal_moves:
-            best_score = max(best_score, self.min_value(game.forecast_move(move), depth-1))
+            if self.in_place:
+                game.push(move)
+                score = self.min_value(game, depth-1)
+                game.pop()
+            else:
+                score = self.min_value(game.forecast_move(move), depth-1)
+            best_score = max(best_score, score)
 
         return best_score
         
@@ -245,16 +809,30 @@ class MinimaxPlayer(IsolationPlayer):
             The minimum heuristic value of the current game state to my agent;
 
         """
-        if self.time_left() < self.TIMER_THRESHOLD:
-            raise SearchTimeout()
+        self.nodes += 1
+        if self.nodes >= self._next_check:
+            self._check_time()
             
+        # Leaves are scored without generating their moves; the score
+        # functions detect terminal states themselves
+        if depth <= 0:
+            self.leaves += 1
+            return self.score(game, self)
+
         legal_moves = game.get_legal_moves()
-        if not legal_moves or depth <= 0:
+        if not legal_moves:
+            self.leaves += 1
             return self.score(game, self)
 
         best_score = float("inf")
         for move in legal_moves:
-            best_score = min(best_score, self.max_value(game.forecast_move(move), depth-1))
+            if self.in_place:
+                game.push(move)
+                score = self.max_value(game, depth-1)
+                game.pop()
+            else:
+                score = self.max_value(game.forecast_move(move), depth-1)
+            best_score = min(best_score, score)
 
         return best_score
         
@@ -296,8 +874,9 @@ class MinimaxPlayer(IsolationPlayer):
                 each helper function or else your agent will timeout during
                 testing.
         """
-        if self.time_left() < self.TIMER_THRESHOLD:
-            raise SearchTimeout()
+        self.nodes += 1
+        # The root always reads the clock, as it may be given a new one
+        self._check_time()
 
         best_move = (-1, -1)
         legal_moves = game.get_legal_moves()
@@ -307,9 +886,19 @@ class MinimaxPlayer(IsolationPlayer):
         # Initialise a best move with the first option
         best_move = legal_moves[0]
 
+        # Search on a private working board, so that a timeout in the middle
+        # of a push()/pop() pair cannot leave the caller's board modified
+        if self.in_place:
+            game = game.copy()
+
         best_score = float("-inf")
         for move in legal_moves:
-            score = self.min_value(game.forecast_move(move), depth-1)
+            if self.in_place:
+                game.push(move)
+                score = self.min_value(game, depth-1)
+                game.pop()
+            else:
+                score = self.min_value(game.forecast_move(move), depth-1)
 
             # If score is greater than the best score, take the move and score
             if best_score < score:
@@ -322,8 +911,78 @@ class AlphaBetaPlayer(IsolationPlayer):
     """Game-playing agent that chooses a move using iterative deepening minimax
     search with alpha-beta pruning. You must finish and test this player to
     make sure it returns a good move before the search time limit expires.
-    """
 
+    Parameters
+    ----------
+    tt_size_mb : float (optional)
+        Memory budget in megabytes of a transposition table shared by every
+        search of the same game; None or 0 disables the table.
+
+    tt_policy : str (optional)
+        Replacement policy of the transposition table, "depth" or "always".
+
+    tt_symmetry : bool (optional)
+        If True, key the transposition table on `Board.canonical()` instead
+        of `Board.hash()`, so the rotations and reflections of a position
+        share one entry.
+
+    move_ordering : `MoveOrdering` (optional)
+        The move ordering strategy (e.g., `KillerHistoryOrdering()`); None
+        searches moves in the order returned by the board.
+
+    time_manager : `TimeManager` (optional)
+        Decides when iterative deepening stops; None deepens until the timer
+        expires and discards the unfinished iteration.
+
+    pvs : bool (optional)
+        If True, use principal variation search: every move after the first
+        one of a node is first searched with a null window.
+
+    aspiration : float (optional)
+        Half-width of the aspiration window around the score of the previous
+        iteration that iterative deepening searches the root with (widened
+        when the search fails); None searches with the full window.
+
+    endgame_solver : bool (optional)
+        If True, once the players can no longer reach each other, follow a
+        longest path of the player's region found by the exact solver of
+        `isolation.Board.longest_path()` instead of searching. Boards without
+        the solver (e.g., the stock board of the project reviewers) are
+        always searched.
+
+    book : `OpeningBook` or str (optional)
+        An opening book, or the path of an opening book file to load; book
+        positions are answered without searching. None plays the first move
+        of each player with the rules of `get_first_move()`.
+
+    See `IsolationPlayer` for the other parameters.
+    """
+    def __init__(self, search_depth=3, score_fn=custom_score, timeout=10.,
+                 in_place=False, tt_size_mb=None, tt_policy="depth",
+                 tt_symmetry=False,
+                 move_ordering=None, time_manager=None, pvs=False,
+                 aspiration=None, endgame_solver=True, book=None):
+        super().__init__(search_depth, score_fn, timeout, in_place)
+        self.tt = None
+        if tt_size_mb:
+            self.tt = TranspositionTable(tt_size_mb, tt_policy)
+        self.tt_symmetry = tt_symmetry
+        self.move_ordering = move_ordering
+        self.time_manager = time_manager
+        self.pvs = pvs
+        self.aspiration = aspiration
+        self.endgame_solver = endgame_solver
+        if isinstance(book, str):
+            book = OpeningBook.load(book)
+        self.book = book
+        self.researches = 0
+        self._root_depth = 0
+        self._pv_move = None
+        self._partial_move = None
+        self._root_score = 0.
+        self._endgame_path = []
+
+    @record_stats
     def get_move(self, game, time_left):
         """Search for the best move from the available legal moves and return a
         result before the time limit expires.
@@ -358,44 +1017,173 @@ class AlphaBetaPlayer(IsolationPlayer):
         self.time_left = time_left
         self.search_depth = 1
 
+        # The transposition table is kept for the whole game (it is cleared by
+        # new_game()), but entries from earlier moves may be replaced
+        if self.tt is not None:
+            self.tt.new_search()
+        if self.move_ordering is not None:
+            self.move_ordering.new_search()
+        manager = self.time_manager
+        if manager is not None:
+            manager.new_search()
+        self._pv_move = None
+
         legal_moves = game.get_legal_moves()
         if not legal_moves:
             return (-1, -1)
         elif len(legal_moves) == 1:
             return legal_moves[0]
 
+        if self.book is not None:
+            move = self.book.probe(game)
+            if move in legal_moves:
+                return move
+
         first_move, is_first_move = self.get_first_move(game)
         if is_first_move:
             return first_move
 
-        # Initialize the best move so that this function returns something
-        # in case the search fails due to timeout
-        best_move = legal_moves[0]
+        if self.endgame_solver:
+            move = self.endgame_move(game, legal_moves)
+            if move is not None:
+                return move
+
+        # The first legal move is returned in case the search fails due to
+        # timeout
+        return self.iterative_deepening(game, legal_moves[0])
+
+    def endgame_move(self, game, legal_moves):
+        """Return the next move of a longest path of the player's region if
+        the board is partitioned, or None to search as usual.
+
+        After a partition, the moves of the opponent no longer change the
+        moves left to the player, so the best move is the first move of a
+        longest path, and the rest of the path is followed on the next moves.
+        The solver may use half of the time left; if it does not finish, the
+        position is searched with the remaining time.
+        """
+        path = self._endgame_path
+        if path and path[0] in legal_moves:
+            return path.pop(0)
+        self._endgame_path = []
+        if not hasattr(game, "is_partitioned") or not game.is_partitioned():
+            return None
+
+        limit = (self.time_left() + self.TIMER_THRESHOLD) / 2
+        path = game.longest_path(self, lambda: self.time_left() < limit)
+        if not path:
+            return None
+        self._endgame_path = path[1:]
+        return path[0]
+
+    def iterative_deepening(self, game, best_move, depth=1, max_depth=None):
+        """Search with increasing depths until the timer expires (or the time
+        manager stops the search), an iteration proves the outcome of the
+        game or the depth reaches the number of blank cells, and return the
+        best move of the last completed iteration.
+
+        Parameters
+        ----------
+        game : `isolation.Board`
+            The position to search, with this player to move.
+
+        best_move : (int, int)
+            The move returned if no iteration completes.
+
+        depth : int (optional)
+            The depth of the first iteration; when it is greater than 1,
+            `best_move` is taken as the result of the previous iteration
+            (e.g., of an earlier search of the same position) and searched
+            first.
+
+        max_depth : int (optional)
+            The depth of the last iteration; None deepens until the search
+            stops on time or the game is solved.
+        """
+        manager = self.time_manager
+        self.search_depth = depth
+        if depth > 1:
+            self._pv_move = best_move
+            self.depth_completed = depth - 1
+
+        # No game lasts more plies than there are blank cells
+        blank_cells = game.width * game.height - game.move_count
 
         # Initte loop until hitting timer threshold
         #search_depth_threshold = 30
-        while True:
+        while max_depth is None or self.search_depth <= max_depth:
+            if self.search_depth > blank_cells:
+                break
+            if manager is not None and not manager.can_start(
+                    self.time_left() - self.TIMER_THRESHOLD):
+                break
+            start_nodes, start_time = self.nodes, self.time_left()
+            self._partial_move = None
             try:
                 # Iterative deepening search
-                move = self.alphabeta(game, self.search_depth)
+                if self.aspiration and self.depth_completed:
+                    move = self.aspiration_search(game, self.search_depth)
+                else:
+                    move = self.alphabeta(game, self.search_depth)
                 if move == (-1, -1):
                     break
                 
                 best_move = move
+                self._pv_move = move
+                self.depth_completed = self.search_depth
                 # print("updated best move:", best_move)
                 # if search_depth_threshold < self.search_depth:
                 #     break
 
+                if manager is not None:
+                    manager.record(self.nodes - start_nodes,
+                                   start_time - self.time_left())
+                # A won or lost game has nothing left to search
+                if abs(self._root_score) == float("inf"):
+                    break
+
                 self.search_depth += 1
 
             except SearchTimeout:
                 # When hitting timer threshold, stop iterative deepening search
                 # print("SearchTimeout occurred.")
+                if manager is not None:
+                    partial = (manager.partial_results and
+                               self._partial_move is not None)
+                    if partial:
+                        best_move = self._partial_move
+                    manager.abort(self.nodes - start_nodes, partial)
                 break
 
         # Return the best move from the last completed search iteration
         return best_move
 
+    def aspiration_search(self, game, depth):
+        """Search the root with a window of half-width `self.aspiration`
+        around the score of the previous iteration, and search it again with
+        a window open on the side of a failure, until the score falls inside
+        the window. Return the best move.
+        """
+        score = self._root_score
+        if abs(score) == float("inf"):
+            return self.alphabeta(game, depth)
+        alpha, beta = score - self.aspiration, score + self.aspiration
+        while True:
+            move = self.alphabeta(game, depth, alpha, beta)
+            if alpha > float("-inf") and self._root_score <= alpha:
+                alpha = float("-inf")
+            elif beta < float("inf") and self._root_score >= beta:
+                beta = float("inf")
+            else:
+                return move
+            self.researches += 1
+
+    def new_game(self):
+        super().new_game()
+        self._endgame_path = []
+        if self.tt is not None:
+            self.tt.clear()
+
     def get_first_move(self, game):
         """Select first move from the good opening book based on the lesson Solving 5x5 Isolation from Malcolm
             1. Move to the centre if possible
@@ -465,23 +1253,83 @@ class AlphaBetaPlayer(IsolationPlayer):
             Negative infinity if there are no legal moves;
 
         """
-        if self.time_left() < self.TIMER_THRESHOLD:
-            raise SearchTimeout()
+        self.nodes += 1
+        if self.nodes >= self._next_check:
+            self._check_time()
+
+        hint = None
+        tt = self.tt
+        if tt is not None and depth > 0:
+            key, symmetry = self._tt_key(game)
+            entry = tt.probe(key)
+            if entry is not None:
+                hint = entry[4]
+                if symmetry:
+                    hint = game.from_canonical(hint, symmetry)
+                if entry[1] >= depth:
+                    alpha, beta, cutoff = self._tt_window(entry, alpha, beta)
+                    if cutoff:
+                        return entry[3]
+            window = alpha, beta
+
+        # Leaves are scored without generating their moves; the score
+        # functions detect terminal states themselves
+        if depth <= 0:
+            self.leaves += 1
+            return self.score(game, self)
 
         legal_moves = game.get_legal_moves()
-        if not legal_moves or depth <= 0:
+        if not legal_moves:
+            self.leaves += 1
             return self.score(game, self)
 
+        ordering = self.move_ordering
+        if ordering is not None:
+            ply = self._root_depth - depth
+            legal_moves = ordering.order(legal_moves, ply, hint)
+
         best_score = float("-inf")
-        for move in legal_moves:
-            best_score = max(best_score, self.min_value(game.forecast_move(move), depth-1, alpha, beta))
+        best_move = legal_moves[0]
+        for searched, move in enumerate(legal_moves, 1):
+            child = game
+            if self.in_place:
+                game.push(move)
+            else:
+                child = game.forecast_move(move)
+
+            # After the first move, principal variation search only tests
+            # whether a move beats alpha with a null window, and searches it
+            # again with the full window if it does
+            if (self.pvs and searched > 1 and alpha > float("-inf") and
+                    alpha + NULL_WINDOW < beta):
+                score = self.min_value(child, depth-1, alpha, alpha + NULL_WINDOW)
+                if alpha + NULL_WINDOW <= score < beta:
+                    self.researches += 1
+                    score = self.min_value(child, depth-1, alpha, beta)
+            else:
+                score = self.min_value(child, depth-1, alpha, beta)
+
+            if self.in_place:
+                game.pop()
 
             # If score is greater than the best score, take the move and score
+            if score > best_score:
+                best_score, best_move = score, move
+
             if best_score >= beta:
-                return best_score
+                self.cutoffs += 1
+                break
 
             alpha = max(alpha, best_score)
 
+        if ordering is not None:
+            ordering.record(ply, depth, best_move, searched, best_score >= beta)
+
+        if tt is not None:
+            if symmetry:
+                best_move = game.to_canonical(best_move, symmetry)
+            self._tt_store(key, depth, window, best_score, best_move)
+
         return best_score
         
     def min_value(self, game, depth, alpha, beta):
@@ -518,24 +1366,127 @@ class AlphaBetaPlayer(IsolationPlayer):
             Infinity if there are no legal moves;
 
         """
-        if self.time_left() < self.TIMER_THRESHOLD:
-            raise SearchTimeout()
-            
+        self.nodes += 1
+        if self.nodes >= self._next_check:
+            self._check_time()
+
+        hint = None
+        tt = self.tt
+        if tt is not None and depth > 0:
+            key, symmetry = self._tt_key(game)
+            entry = tt.probe(key)
+            if entry is not None:
+                hint = entry[4]
+                if symmetry:
+                    hint = game.from_canonical(hint, symmetry)
+                if entry[1] >= depth:
+                    alpha, beta, cutoff = self._tt_window(entry, alpha, beta)
+                    if cutoff:
+                        return entry[3]
+            window = alpha, beta
+
+        # Leaves are scored without generating their moves; the score
+        # functions detect terminal states themselves
+        if depth <= 0:
+            self.leaves += 1
+            return self.score(game, self)
+
         legal_moves = game.get_legal_moves()
-        if not legal_moves or depth <= 0:
+        if not legal_moves:
+            self.leaves += 1
             return self.score(game, self)
 
+        ordering = self.move_ordering
+        if ordering is not None:
+            ply = self._root_depth - depth
+            legal_moves = ordering.order(legal_moves, ply, hint)
+
         best_score = float("inf")
-        for move in legal_moves:
-            best_score = min(best_score, self.max_value(game.forecast_move(move), depth-1, alpha, beta))
+        best_move = legal_moves[0]
+        for searched, move in enumerate(legal_moves, 1):
+            child = game
+            if self.in_place:
+                game.push(move)
+            else:
+                child = game.forecast_move(move)
+
+            # See max_value()
+            if (self.pvs and searched > 1 and beta < float("inf") and
+                    alpha < beta - NULL_WINDOW):
+                score = self.max_value(child, depth-1, beta - NULL_WINDOW, beta)
+                if alpha < score <= beta - NULL_WINDOW:
+                    self.researches += 1
+                    score = self.max_value(child, depth-1, alpha, beta)
+            else:
+                score = self.max_value(child, depth-1, alpha, beta)
+
+            if self.in_place:
+                game.pop()
+
+            if score < best_score:
+                best_score, best_move = score, move
 
             if best_score <= alpha:
-                return best_score
+                self.cutoffs += 1
+                break
 
             beta = min(beta, best_score)
 
+        if ordering is not None:
+            ordering.record(ply, depth, best_move, searched, best_score <= alpha)
+
+        if tt is not None:
+            if symmetry:
+                best_move = game.to_canonical(best_move, symmetry)
+            self._tt_store(key, depth, window, best_score, best_move)
+
         return best_score
 
+    def _tt_key(self, game):
+        """Return the transposition table key of a position, and the symmetry
+        that maps its moves to the orientation they are stored in (None or 0
+        when they are stored as played).
+        """
+        if self.tt_symmetry:
+            return game.canonical()
+        return game.hash(), None
+
+    def _tt_window(self, entry, alpha, beta):
+        """Narrow the (alpha, beta) window with the bound stored in a
+        transposition table entry searched at least as deep as the current
+        node.
+
+        Returns
+        -------
+        (float, float, bool)
+            The new alpha and beta, and True if the entry value can be
+            returned without searching the node.
+        """
+        flag, value = entry[2], entry[3]
+        if flag == TranspositionTable.EXACT:
+            alpha = beta = value
+        elif flag == TranspositionTable.LOWER:
+            alpha = max(alpha, value)
+        else:
+            beta = min(beta, value)
+
+        cutoff = alpha >= beta
+        if cutoff:
+            self.tt.cutoffs += 1
+        return alpha, beta, cutoff
+
+    def _tt_store(self, key, depth, window, value, move):
+        """Store a node result in the transposition table with the bound type
+        implied by the (alpha, beta) window it was searched with.
+        """
+        if value <= window[0]:
+            flag = TranspositionTable.UPPER
+        elif value >= window[1]:
+            flag = TranspositionTable.LOWER
+        else:
+            flag = TranspositionTable.EXACT
+        self.tt.store(key, depth, flag, value, move)
+
     def alphabeta(self, game, depth, alpha=float("-inf"), beta=float("inf")):
         """Implement depth-limited minimax search with alpha-beta pruning as
         described in the lectures.
@@ -584,24 +1535,259 @@ class AlphaBetaPlayer(IsolationPlayer):
                 each helper function or else your agent will timeout during
                 testing.
         """
-        if self.time_left() < self.TIMER_THRESHOLD:
-            raise SearchTimeout()
+        self.nodes += 1
+        # The root always reads the clock, as it may be given a new one
+        self._check_time()
 
         best_move = (-1, -1)
         legal_moves = game.get_legal_moves()
         if not legal_moves:
             return best_move
 
+        # Search the best move of the previous iteration first
+        self._root_depth = depth
+        if self.move_ordering is not None:
+            legal_moves = self.move_ordering.order(legal_moves, 0, self._pv_move)
+        elif self._pv_move in legal_moves:
+            legal_moves.remove(self._pv_move)
+            legal_moves.insert(0, self._pv_move)
+        pv_first = self._pv_move is not None and legal_moves[0] == self._pv_move
+        self._partial_move = None
+
         # Initialise a best move with the first option
         best_move = legal_moves[0]
+
+        # Search on a private working board, so that a timeout in the middle
+        # of a push()/pop() pair cannot leave the caller's board modified
+        if self.in_place:
+            game = game.copy()
+
+        root_alpha = alpha
         best_score = float("-inf")
-        for move in legal_moves:
-            score = self.min_value(game.forecast_move(move), depth-1, alpha, beta)
+        for searched, move in enumerate(legal_moves, 1):
+            child = game
+            if self.in_place:
+                game.push(move)
+            else:
+                child = game.forecast_move(move)
+
+            # See max_value()
+            if (self.pvs and searched > 1 and alpha > float("-inf") and
+                    alpha + NULL_WINDOW < beta):
+                score = self.min_value(child, depth-1, alpha, alpha + NULL_WINDOW)
+                if alpha + NULL_WINDOW <= score < beta:
+                    self.researches += 1
+                    score = self.min_value(child, depth-1, alpha, beta)
+            else:
+                score = self.min_value(child, depth-1, alpha, beta)
+
+            if self.in_place:
+                game.pop()
 
             # If score is greater than the best score, take the move and score
             if best_score < score:
                 best_score = score
                 best_move = move
 
+            # Once the best move of the previous iteration has been searched,
+            # the best move so far is a sound result of a partial iteration,
+            # unless its score is only an upper bound (below the alpha of an
+            # aspiration window that the iteration fails low on)
+            if pv_first and (root_alpha == float("-inf") or
+                             best_score > root_alpha):
+                self._partial_move = best_move
+
+            # Only an aspiration window (or a won game) fails high
+            if best_score >= beta:
+                break
+
             alpha = max(alpha, best_score)
+        self._root_score = best_score
         return best_move
+
+
+# Cell indices reachable with a knight move from each cell, per board size
+_KNIGHT_MOVES = {}
+
+
+def _knight_moves(width, height):
+    """Return, for every cell index `row + column * height`, the list of the
+    (bit, index) pairs of the cells reachable with a knight move.
+    """
+    table = _KNIGHT_MOVES.get((width, height))
+    if table is None:
+        table = []
+        for idx in range(width * height):
+            r, c = idx % height, idx // height
+            table.append([(1 << (r + dr + (c + dc) * height),
+                           r + dr + (c + dc) * height)
+                          for dr, dc in DIRECTIONS
+                          if 0 <= r + dr < height and 0 <= c + dc < width])
+        _KNIGHT_MOVES[(width, height)] = table
+    return table
+
+
+class MCTSPlayer(IsolationPlayer):
+    """Game-playing agent that chooses a move with Monte Carlo tree search:
+    UCT selection, expansion of one node per simulation, and uniformly
+    random playouts until the time limit, after which the most visited move
+    is played.
+
+    The tree and the playouts work on a compact state (an occupancy bitmask
+    and the cell indices of the players) instead of `isolation.Board`
+    copies, so a simulation only costs a few integer operations per move.
+    The tree itself is stored in a few flat lists of integers rather than
+    one object per node, which keeps the garbage collector from pausing the
+    search to scan it. `nodes` and `leaves` count the simulations and
+    `depth_completed` holds the depth of the deepest tree node.
+
+    Parameters
+    ----------
+    exploration : float (optional)
+        The exploration constant of the UCT formula.
+
+    See `IsolationPlayer` for the other parameters; the score function is
+    not used.
+    """
+    def __init__(self, search_depth=3, score_fn=custom_score, timeout=10.,
+                 exploration=1.4):
+        super().__init__(search_depth, score_fn, timeout)
+        self.exploration = exploration
+        self.rng = random.Random()
+        self._tree = None
+
+    @record_stats
+    def get_move(self, game, time_left):
+        """Search for the best move until the time limit expires (see
+        `AlphaBetaPlayer.get_move()` for the parameters).
+
+        Returns
+        -------
+        (int, int)
+            Board coordinates corresponding to a legal move; may return
+            (-1, -1) if there are no available legal moves.
+        """
+        self.time_left = time_left
+        legal_moves = game.get_legal_moves()
+        if not legal_moves:
+            return (-1, -1)
+        elif len(legal_moves) == 1:
+            return legal_moves[0]
+
+        # The tree of the previous move is freed here rather than when that
+        # move was returned, where it would count against its time limit
+        self._tree = None
+        try:
+            self.search(game)
+        except SearchTimeout:
+            pass
+
+        moves, visits, _, first, count, _ = self._tree
+        if count[0] <= 0 or not visits[first[0]]:
+            return legal_moves[0]
+        best = max(range(first[0], first[0] + count[0]),
+                   key=visits.__getitem__)
+        return (moves[best] % game.height, moves[best] // game.height)
+
+    def search(self, game):
+        """Run simulations from the current position until the time limit
+        expires (raising `SearchTimeout`).
+
+        The tree is kept in `self._tree` as lists indexed by node (the root
+        is node 0): the cell index of the move leading to the node, the
+        number of simulations through the node and of those won by the
+        player who made the move, the index of the first child and the
+        number of children (-1 until the node is expanded; the children of
+        a node are consecutive and in random order), and the number of
+        children already simulated.
+        """
+        width, height = game.width, game.height
+        table = _knight_moves(width, height)
+        occupied = (1 << (width * height)) - 1
+        for r, c in game.get_blank_spaces():
+            occupied ^= 1 << (r + c * height)
+        locs = [game.get_player_location(game.active_player),
+                game.get_player_location(game.inactive_player)]
+        root_locs = [None if loc is None else loc[0] + loc[1] * height
+                     for loc in locs]
+
+        def legal_moves(loc, occupied):
+            # Players who have not moved yet can move to any blank cell
+            if loc is None:
+                return [idx for idx in range(width * height)
+                        if not occupied >> idx & 1]
+            return [idx for bit, idx in table[loc] if not occupied & bit]
+
+        moves, visits, wins, first, count, tried = self._tree = (
+            [-1], [0], [0], [0], [-1], [0])
+        c = self.exploration
+        log = math.log
+        sqrt = math.sqrt
+        rng = self.rng
+        choice = rng.choice
+        while True:
+            self.nodes += 1
+            if self.nodes >= self._next_check:
+                self._check_time()
+
+            # Selection and expansion: descend with UCT until a child that
+            # was never simulated (or a terminal node); `me` is to move
+            node = 0
+            path = [0]
+            occ = occupied
+            me, opp = root_locs
+            while True:
+                n = count[node]
+                if n < 0:
+                    children = legal_moves(me, occ)
+                    rng.shuffle(children)
+                    n = count[node] = len(children)
+                    first[node] = len(moves)
+                    moves.extend(children)
+                    visits.extend([0] * n)
+                    wins.extend([0] * n)
+                    first.extend([0] * n)
+                    count.extend([-1] * n)
+                    tried.extend([0] * n)
+                if not n:
+                    break
+                if tried[node] < n:
+                    node = first[node] + tried[node]
+                    tried[path[-1]] += 1
+                else:
+                    start = first[node]
+                    scale = c * sqrt(log(visits[node]))
+                    node = max(range(start, start + n), key=lambda i: (
+                        wins[i] / visits[i] + scale / sqrt(visits[i])))
+                path.append(node)
+                occ |= 1 << moves[node]
+                me, opp = opp, moves[node]
+                if not visits[node]:
+                    break
+            self.depth_completed = max(self.depth_completed, len(path) - 1)
+
+            # Playout: the player to move without a legal move loses, so the
+            # player who made the move into `node` wins if the playout ends
+            # after an even number of moves
+            plies = 0
+            while True:
+                if me is None:
+                    candidates = legal_moves(me, occ)
+                else:
+                    candidates = [idx for bit, idx in table[me]
+                                  if not occ & bit]
+                if not candidates:
+                    break
+                move = choice(candidates)
+                occ |= 1 << move
+                me, opp = opp, move
+                plies += 1
+            self.leaves += 1
+
+            # Backpropagation
+            won = plies % 2 == 0
+            for node in reversed(path):
+                visits[node] += 1
+                if won:
+                    wins[node] += 1
+                won = not won
@@ -9,9 +9,156 @@ be available to project reviewers.
 """
 import random
 import timeit
-from copy import copy
 
 TIME_LIMIT_MILLIS = 150
+STOP_INTERVAL = 128  # states searched by longest_path() between stop() calls
+
+# Relative (row, column) offsets of the L-shaped knight moves
+DIRECTIONS = [(-2, -1), (-2, 1), (-1, -2), (-1, 2),
+              (1, -2), (1, 2), (2, -1), (2, 1)]
+
+# Move tables are shared by every board with the same dimensions
+_MOVE_TABLES = {}
+
+try:
+    _popcount = int.bit_count
+except AttributeError:  # Python < 3.10
+    def _popcount(mask):
+        return bin(mask).count("1")
+
+
+def _reach(masks, loc, free):
+    """Return the mask of the cells of `free` reachable with a sequence of
+    knight moves from the cell index `loc`.
+    """
+    region = frontier = masks[loc] & free
+    while frontier:
+        reach = 0
+        while frontier:
+            bit = frontier & -frontier
+            reach |= masks[bit.bit_length() - 1]
+            frontier ^= bit
+        frontier = reach & free & ~region
+        region |= frontier
+    return region
+
+
+def _path_bound(loc, free, light):
+    """Return an upper bound on the number of knight moves from the cell
+    index `loc` over the cells of `free`: a path alternates between cells of
+    the other color and of the color of `loc`.
+    """
+    same = light if (light >> loc) & 1 else ~light
+    same = _popcount(free & same)
+    other = _popcount(free) - same
+    return 2 * same + 1 if other > same else 2 * other
+
+
+class _SearchStopped(Exception):
+    """Raised to abandon `Board.longest_path()`. """
+    pass
+
+
+class _MoveTable(object):
+    """Precomputed per-cell lookup tables for a board of a given size.
+
+    Cells are indexed the same way as the original list-backed board, i.e.,
+    cell (row, column) has index `row + column * height`, and bit `idx` of an
+    occupancy mask is set when that cell is blocked.
+
+    Attributes
+    ----------
+    masks : list<int>
+        Bitmask of every cell reachable with a knight move from each cell.
+
+    light : int
+        Bitmask of the cells with an even row + column sum; every knight move
+        goes between a light and a dark cell.
+
+    neighbors : list<tuple<(int, (int, int))>>
+        The (bit, move) pairs of every cell reachable from each cell, in the
+        order of `DIRECTIONS`.
+
+    cells : list<(int, int)>
+        The (row, column) coordinate pair of each cell index.
+
+    zobrist_cells, zobrist_p1, zobrist_p2 : list<int>
+        Random 64-bit Zobrist keys for a blocked cell and for the location of
+        each player on every cell.
+
+    zobrist_side : int
+        Random 64-bit Zobrist key that is toggled when player 2 has the
+        initiative.
+
+    symmetries, inverses : list<list<int>>
+        The cell permutation of every symmetry of the board (the identity,
+        the reflections and, on a square board, the rotations and diagonal
+        reflections): `symmetries[t][idx]` is the index of the cell that
+        symmetry t maps the cell index `idx` to. `inverses[t]` is the inverse
+        permutation.
+
+    symmetric_cells, symmetric_p1, symmetric_p2 : list<list<int>>
+        The Zobrist keys of each symmetry: `symmetric_cells[t][idx]` is the
+        key of the cell that symmetry t maps the cell index `idx` to, so the
+        hash of a transformed state is computed without transforming it.
+    """
+    def __init__(self, width, height):
+        # Seed the keys with the board size so that hashes are reproducible
+        # across runs (e.g., for opening books stored on disk)
+        rng = random.Random("zobrist-{}x{}".format(width, height))
+        self.zobrist_cells = [rng.getrandbits(64) for _ in range(width * height)]
+        self.zobrist_p1 = [rng.getrandbits(64) for _ in range(width * height)]
+        self.zobrist_p2 = [rng.getrandbits(64) for _ in range(width * height)]
+        self.zobrist_side = rng.getrandbits(64)
+
+        self.cells = [(idx % height, idx // height)
+                      for idx in range(width * height)]
+        self.light = sum(1 << idx for idx, (r, c) in enumerate(self.cells)
+                         if not (r + c) % 2)
+        self.neighbors = []
+        self.masks = []
+        for r, c in self.cells:
+            pairs = tuple((1 << (r + dr + (c + dc) * height), (r + dr, c + dc))
+                          for dr, dc in DIRECTIONS
+                          if 0 <= r + dr < height and 0 <= c + dc < width)
+            self.neighbors.append(pairs)
+            mask = 0
+            for bit, _ in pairs:
+                mask |= bit
+            self.masks.append(mask)
+
+        maps = [lambda r, c: (r, c),
+                lambda r, c: (height - 1 - r, c),
+                lambda r, c: (r, width - 1 - c),
+                lambda r, c: (height - 1 - r, width - 1 - c)]
+        if width == height:
+            maps += [lambda r, c: (c, r),
+                     lambda r, c: (c, height - 1 - r),
+                     lambda r, c: (width - 1 - c, r),
+                     lambda r, c: (width - 1 - c, height - 1 - r)]
+        self.symmetries = []
+        self.inverses = []
+        for f in maps:
+            perm = [r + c * height for r, c in (f(*cell) for cell in self.cells)]
+            inverse = [0] * len(perm)
+            for idx, target in enumerate(perm):
+                inverse[target] = idx
+            self.symmetries.append(perm)
+            self.inverses.append(inverse)
+        self.symmetric_cells = [[self.zobrist_cells[i] for i in perm]
+                                for perm in self.symmetries]
+        self.symmetric_p1 = [[self.zobrist_p1[i] for i in perm]
+                             for perm in self.symmetries]
+        self.symmetric_p2 = [[self.zobrist_p2[i] for i in perm]
+                             for perm in self.symmetries]
+
+
+def _move_table(width, height):
+    """Return the (cached) move table for a board of the given size. """
+    table = _MOVE_TABLES.get((width, height))
+    if table is None:
+        table = _MOVE_TABLES[(width, height)] = _MoveTable(width, height)
+    return table
 
 
 class Board(object):
@@ -33,11 +180,34 @@ class Board(object):
 
     height : int (optional)
         The number of rows that the board should have.
+
+    shuffle : bool (optional)
+        If True (default), the legal moves of a player are returned in random
+        order. If False, they are returned in a fixed order (the order of
+        `DIRECTIONS`), which makes searches and benchmarks reproducible and
+        keeps the random number generator out of move generation.
+
+    Notes
+    -----
+    The game state is stored as a bitboard: blocked cells are packed into a
+    single integer occupancy mask, and the knight moves from every cell are
+    looked up in a per-size table, so copying a board or generating moves
+    never touches a per-cell Python list.
+
+    Boards use `__slots__` instead of an instance dictionary, since searches
+    that call `forecast_move()` create one board per node: a board is a
+    single fixed-size object, and the undo stack of `push()` is only
+    allocated by the first push.
     """
     BLANK = 0
     NOT_MOVED = None
 
-    def __init__(self, player_1, player_2, width=7, height=7):
+    __slots__ = ("width", "height", "move_count", "_player_1", "_player_2",
+                 "_active_player", "_inactive_player", "_table", "_occupied",
+                 "_p1_loc", "_p2_loc", "_initiative", "_hash", "_shuffle",
+                 "_symmetric_hashes", "_p1_moves", "_p2_moves", "_undo")
+
+    def __init__(self, player_1, player_2, width=7, height=7, shuffle=True):
         self.width = width
         self.height = height
         self.move_count = 0
@@ -46,14 +216,127 @@ class Board(object):
         self._active_player = player_1
         self._inactive_player = player_2
 
-        # The last 3 entries of the board state includes initiative (0 for
-        # player 1, 1 for player 2) player 2 last move, and player 1 last move
-        self._board_state = [Board.BLANK] * (width * height + 3)
-        self._board_state[-1] = Board.NOT_MOVED
-        self._board_state[-2] = Board.NOT_MOVED
+        # Occupied cells are set bits of a single integer; the player
+        # locations are cell indices (or NOT_MOVED), and the initiative is 0
+        # for player 1 and 1 for player 2
+        self._table = _move_table(width, height)
+        self._occupied = 0
+        self._p1_loc = Board.NOT_MOVED
+        self._p2_loc = Board.NOT_MOVED
+        self._initiative = 0
+        self._hash = 0
+        self._shuffle = shuffle
+
+        # Hash of the state transformed by each board symmetry, computed on
+        # the first call to canonical() and then updated with every move
+        self._symmetric_hashes = None
+
+        # Legal moves of each player, memoized until the next move is applied
+        self._p1_moves = None
+        self._p2_moves = None
+
+        # Previous location of the moving player for every push(), or None
+        # before the first push
+        self._undo = None
 
     def hash(self):
-        return str(self._board_state).__hash__()
+        """Return the 64-bit Zobrist hash of the current state.
+
+        The hash covers the blocked cells, both player locations and the
+        player with initiative. It is updated incrementally as moves are
+        applied, so calling it costs O(1).
+        """
+        return self._hash
+
+    def canonical(self):
+        """Return the canonical hash of the current state and the symmetry
+        that maps the board to its canonical orientation.
+
+        The canonical hash is the smallest Zobrist hash of the state
+        transformed by each symmetry of the board (see `hash()`), so every
+        rotation or reflection of a state has the same canonical hash. Moves
+        can be converted between the two orientations with `to_canonical()`
+        and `from_canonical()`, e.g., to share cache entries between
+        symmetric states.
+
+        The hashes of the transformed states are computed on the first call
+        and then updated incrementally as moves are applied or undone.
+
+        Returns
+        -------
+        (int, int)
+            The canonical hash and the index of the symmetry.
+        """
+        hashes = self._symmetric_hashes
+        if hashes is None:
+            hashes = self._symmetric_hashes = self._compute_symmetric_hashes()
+        key = min(hashes)
+        return key, hashes.index(key)
+
+    def canonical_hash(self):
+        """Return the hash shared by the current state and all of its
+        rotations and reflections (see `canonical()`).
+        """
+        return self.canonical()[0]
+
+    def to_canonical(self, move, symmetry):
+        """Map a move to the canonical orientation given by `canonical()`. """
+        idx = self._table.symmetries[symmetry][move[0] + move[1] * self.height]
+        return self._table.cells[idx]
+
+    def from_canonical(self, move, symmetry):
+        """Map a move from the canonical orientation given by `canonical()`
+        back to the orientation of the board.
+        """
+        idx = self._table.inverses[symmetry][move[0] + move[1] * self.height]
+        return self._table.cells[idx]
+
+    def _compute_symmetric_hashes(self):
+        """Return the list of the hashes of the state transformed by every
+        symmetry of the board.
+        """
+        table = self._table
+        hashes = []
+        for t in range(len(table.symmetries)):
+            cells = table.symmetric_cells[t]
+            key = table.zobrist_side if self._initiative else 0
+            occupied = self._occupied
+            while occupied:
+                bit = occupied & -occupied
+                key ^= cells[bit.bit_length() - 1]
+                occupied ^= bit
+            if self._p1_loc != Board.NOT_MOVED:
+                key ^= table.symmetric_p1[t][self._p1_loc]
+            if self._p2_loc != Board.NOT_MOVED:
+                key ^= table.symmetric_p2[t][self._p2_loc]
+            hashes.append(key)
+        return hashes
+
+    def _update_symmetric_hashes(self, idx, prev_loc, keys):
+        """Toggle the move of a player from `prev_loc` to the cell index
+        `idx` (blocking it) in the hash of every transformed state.
+        """
+        side = self._table.zobrist_side
+        hashes = self._symmetric_hashes
+        for t, cells in enumerate(self._table.symmetric_cells):
+            player_keys = keys[t]
+            key = hashes[t] ^ cells[idx] ^ side ^ player_keys[idx]
+            if prev_loc != Board.NOT_MOVED:
+                key ^= player_keys[prev_loc]
+            hashes[t] = key
+
+    @property
+    def _board_state(self):
+        """Legacy list view of the game state (read-only).
+
+        The first width * height entries mark blocked cells, and the last 3
+        entries hold the initiative (0 for player 1, 1 for player 2), player 2
+        last move, and player 1 last move.
+        """
+        occupied = self._occupied
+        state = [(occupied >> idx) & 1 for idx in range(self.width * self.height)]
+        state.extend([self._initiative, self._p2_loc, self._p1_loc])
+        return state
 
     @property
     def active_player(self):
@@ -92,13 +375,41 @@ class Board(object):
 
     def copy(self):
         """ Return a deep copy of the current board. """
-        new_board = Board(self._player_1, self._player_2, width=self.width, height=self.height)
+        # Every attribute except the lists is immutable (or a shared lookup
+        # table), so copying the references copies the state
+        new_board = self.__class__.__new__(self.__class__)
+        new_board.width = self.width
+        new_board.height = self.height
         new_board.move_count = self.move_count
+        new_board._player_1 = self._player_1
+        new_board._player_2 = self._player_2
         new_board._active_player = self._active_player
         new_board._inactive_player = self._inactive_player
-        new_board._board_state = copy(self._board_state)
+        new_board._table = self._table
+        new_board._occupied = self._occupied
+        new_board._p1_loc = self._p1_loc
+        new_board._p2_loc = self._p2_loc
+        new_board._initiative = self._initiative
+        new_board._hash = self._hash
+        new_board._shuffle = self._shuffle
+        new_board._p1_moves = self._p1_moves
+        new_board._p2_moves = self._p2_moves
+        hashes, undo = self._symmetric_hashes, self._undo
+        new_board._symmetric_hashes = None if hashes is None else hashes[:]
+        new_board._undo = undo[:] if undo else None
         return new_board
 
+    def __getstate__(self):
+        # The lookup tables are shared by all boards of the same size and
+        # rebuilt (or found in the cache) when unpickling
+        return {name: getattr(self, name) for name in Board.__slots__
+                if name != "_table"}
+
+    def __setstate__(self, state):
+        for name, value in state.items():
+            setattr(self, name, value)
+        self._table = _move_table(self.width, self.height)
+
     def forecast_move(self, move):
         """Return a deep copy of the current game with an input move applied to
         advance the game one ply.
@@ -132,15 +443,15 @@ class Board(object):
         bool
             Returns True if the move is legal, False otherwise
         """
-        idx = move[0] + move[1] * self.height
         return (0 <= move[0] < self.height and 0 <= move[1] < self.width and
-                self._board_state[idx] == Board.BLANK)
+                not (self._occupied >> (move[0] + move[1] * self.height)) & 1)
 
     def get_blank_spaces(self):
         """Return a list of the locations that are still available on the board.
         """
-        return [(i, j) for j in range(self.width) for i in range(self.height)
-                if self._board_state[i + j * self.height] == Board.BLANK]
+        occupied = self._occupied
+        return [cell for idx, cell in enumerate(self._table.cells)
+                if not (occupied >> idx) & 1]
 
     def get_player_location(self, player):
         """Find the current location of the specified player on the board.
@@ -156,24 +467,27 @@ class Board(object):
             The coordinate pair (row, column) of the input player, or None
             if the player has not moved.
         """
+        idx = self._player_index(player)
+        if idx == Board.NOT_MOVED:
+            return Board.NOT_MOVED
+        return self._table.cells[idx]
+
+    def _player_index(self, player):
+        """Return the cell index of the specified player, or NOT_MOVED. """
         if player == self._player_1:
-            if self._board_state[-1] == Board.NOT_MOVED:
-                return Board.NOT_MOVED
-            idx = self._board_state[-1]
+            return self._p1_loc
         elif player == self._player_2:
-            if self._board_state[-2] == Board.NOT_MOVED:
-                return Board.NOT_MOVED
-            idx = self._board_state[-2]
-        else:
-            raise RuntimeError(
-                "Invalid player in get_player_location: {}".format(player))
-        w = idx // self.height
-        h = idx % self.height
-        return (h, w)
+            return self._p2_loc
+        raise RuntimeError(
+            "Invalid player in get_player_location: {}".format(player))
 
     def get_legal_moves(self, player=None):
         """Return the list of all legal moves for the specified player.
 
+        The moves of each player are generated at most once per game state;
+        later calls return a copy of the memoized list (in the same order)
+        until the next move is applied.
+
         Parameters
         ----------
         player : object (optional)
@@ -187,8 +501,47 @@ class Board(object):
             for the player constrained by the current game state.
         """
         if player is None:
-            player = self.active_player
-        return self.__get_moves(self.get_player_location(player))
+            player = self._active_player
+        if player == self._player_1:
+            if self._p1_moves is None:
+                self._p1_moves = self.__get_moves(self._p1_loc)
+            return self._p1_moves[:]
+        elif player == self._player_2:
+            if self._p2_moves is None:
+                self._p2_moves = self.__get_moves(self._p2_loc)
+            return self._p2_moves[:]
+        raise RuntimeError(
+            "Invalid player in get_legal_moves: {}".format(player))
+
+    def count_legal_moves(self, player=None):
+        """Return the number of legal moves for the specified player.
+
+        This is equivalent to `len(self.get_legal_moves(player))`, but uses
+        the memoized move list if there is one, or else counts the set bits of
+        the player's move mask without building a list.
+
+        Parameters
+        ----------
+        player : object (optional)
+            An object registered as a player in the current game. If None,
+            count the legal moves for the active player on the board.
+
+        Returns
+        -------
+        int
+            The number of legal moves for the player.
+        """
+        if player is None:
+            player = self._active_player
+        if player == self._player_1 and self._p1_moves is not None:
+            return len(self._p1_moves)
+        elif player == self._player_2 and self._p2_moves is not None:
+            return len(self._p2_moves)
+
+        loc = self._player_index(player)
+        if loc == Board.NOT_MOVED:
+            return self.width * self.height - _popcount(self._occupied)
+        return _popcount(self._table.masks[loc] & ~self._occupied)
 
     def apply_move(self, move):
         """Move the active player to a specified location.
@@ -200,20 +553,80 @@ class Board(object):
             the active player on the board.
         """
         idx = move[0] + move[1] * self.height
-        last_move_idx = int(self.active_player == self._player_2) + 1
-        self._board_state[-last_move_idx] = idx
-        self._board_state[idx] = 1
-        self._board_state[-3] ^= 1
+        table = self._table
+        if self._initiative:
+            keys, prev_loc, self._p2_loc = table.zobrist_p2, self._p2_loc, idx
+        else:
+            keys, prev_loc, self._p1_loc = table.zobrist_p1, self._p1_loc, idx
+        self._hash ^= table.zobrist_cells[idx] ^ table.zobrist_side ^ keys[idx]
+        if prev_loc != Board.NOT_MOVED:
+            self._hash ^= keys[prev_loc]
+        if self._symmetric_hashes is not None:
+            self._update_symmetric_hashes(idx, prev_loc, table.symmetric_p2
+                                          if self._initiative
+                                          else table.symmetric_p1)
+        self._occupied |= 1 << idx
+        self._p1_moves = self._p2_moves = None
+        self._initiative ^= 1
         self._active_player, self._inactive_player = self._inactive_player, self._active_player
         self.move_count += 1
 
+    def push(self, move):
+        """Apply a move in-place and remember how to undo it with `pop()`.
+
+        This is the allocation-free alternative to `forecast_move()` for
+        search: push a move, search the resulting state, then pop it.
+
+        Parameters
+        ----------
+        move : (int, int)
+            A coordinate pair (row, column) indicating the next position for
+            the active player on the board.
+        """
+        if self._undo is None:
+            self._undo = []
+        self._undo.append(self._p2_loc if self._initiative else self._p1_loc)
+        self.apply_move(move)
+
+    def pop(self):
+        """Undo the most recent move applied with `push()`, restoring the
+        blocked cells, the initiative, both player locations and the move
+        count.
+
+        Returns
+        -------
+        (int, int)
+            The coordinate pair (row, column) of the move that was undone.
+        """
+        if not self._undo:
+            raise IndexError("pop() without a matching push()")
+        initiative = self._initiative ^ 1
+        prev_loc = self._undo.pop()
+        table = self._table
+        if initiative:
+            keys, idx, self._p2_loc = table.zobrist_p2, self._p2_loc, prev_loc
+        else:
+            keys, idx, self._p1_loc = table.zobrist_p1, self._p1_loc, prev_loc
+        self._hash ^= table.zobrist_cells[idx] ^ table.zobrist_side ^ keys[idx]
+        if prev_loc != Board.NOT_MOVED:
+            self._hash ^= keys[prev_loc]
+        if self._symmetric_hashes is not None:
+            self._update_symmetric_hashes(idx, prev_loc, table.symmetric_p2
+                                          if initiative else table.symmetric_p1)
+        self._occupied &= ~(1 << idx)
+        self._p1_moves = self._p2_moves = None
+        self._initiative = initiative
+        self._active_player, self._inactive_player = self._inactive_player, self._active_player
+        self.move_count -= 1
+        return self._table.cells[idx]
+
     def is_winner(self, player):
         """ Test whether the specified player has won the game. """
-        return player == self._inactive_player and not self.get_legal_moves(self._active_player)
+        return player == self._inactive_player and not self._active_has_moves()
 
     def is_loser(self, player):
         """ Test whether the specified player has lost the game. """
-        return player == self._active_player and not self.get_legal_moves(self._active_player)
+        return player == self._active_player and not self._active_has_moves()
 
     def utility(self, player):
         """Returns the utility of the current game state from the perspective
@@ -237,7 +650,7 @@ class Board(object):
             a value of -inf if the player has lost, and a value of 0
             otherwise.
         """
-        if not self.get_legal_moves(self._active_player):
+        if not self._active_has_moves():
 
             if player == self._inactive_player:
                 return float("inf")
@@ -247,19 +660,131 @@ class Board(object):
 
         return 0.
 
+    def _active_has_moves(self):
+        """Test whether the active player has at least one legal move. """
+        loc = self._p2_loc if self._initiative else self._p1_loc
+        if loc == Board.NOT_MOVED:
+            return self._occupied != (1 << (self.width * self.height)) - 1
+        return bool(self._table.masks[loc] & ~self._occupied)
+
+    def _region(self, loc):
+        """Return the mask of the blank cells reachable with a sequence of
+        knight moves from the cell index `loc`.
+        """
+        full = (1 << (self.width * self.height)) - 1
+        return _reach(self._table.masks, loc, full & ~self._occupied)
+
+    def get_region(self, player):
+        """Return the list of blank cells the specified player can still
+        reach, or all blank cells if the player has not moved.
+        """
+        loc = self._player_index(player)
+        if loc == Board.NOT_MOVED:
+            return self.get_blank_spaces()
+        region = self._region(loc)
+        return [cell for idx, cell in enumerate(self._table.cells)
+                if (region >> idx) & 1]
+
+    def is_partitioned(self):
+        """Test whether the players can no longer reach any common cell.
+
+        From then on, the moves of one player never change the moves left to
+        the other, and the game is decided by the longest path each player
+        can make in its own region (see `longest_path()`).
+        """
+        if self._p1_loc == Board.NOT_MOVED or self._p2_loc == Board.NOT_MOVED:
+            return False
+        return not self._region(self._p1_loc) & self._region(self._p2_loc)
+
+    def longest_path(self, player, stop=None):
+        """Return a longest sequence of moves the specified player can make
+        from its location if the opponent never moved again (e.g., once the
+        board is partitioned).
+
+        The exact search is a depth-first search over (location, blank cells)
+        states, memoized and ordered with Warnsdorff's rule (fewest onward
+        moves first), which stops as soon as a path covers every blank cell
+        of the player's region.
+
+        Parameters
+        ----------
+        player : object
+            An object registered as a player in the current game, which has
+            already moved.
+
+        stop : callable (optional)
+            Called every STOP_INTERVAL searched states; the search is
+            abandoned if it returns True.
+
+        Returns
+        -------
+        list<(int, int)> or None
+            The moves of a longest path, or None if `stop` ended the search.
+        """
+        loc = self._player_index(player)
+        masks = self._table.masks
+        light = self._table.light
+        memo = {}
+        calls = [0]
+
+        def search(loc, free):
+            # Return the number of moves of a longest path from `loc` over
+            # the cells of `free`, which are all reachable from `loc`; the
+            # memo also keeps the first move of the path and its state
+            key = (loc, free)
+            if key in memo:
+                return memo[key][0]
+            calls[0] += 1
+            if stop is not None and not calls[0] % STOP_INTERVAL and stop():
+                raise _SearchStopped()
+
+            children = []
+            targets = masks[loc] & free
+            while targets:
+                bit = targets & -targets
+                targets ^= bit
+                idx = bit.bit_length() - 1
+                child = _reach(masks, idx, free ^ bit)
+                children.append((_popcount(masks[idx] & child), idx, child))
+            children.sort()
+
+            best, best_child = 0, None
+            for _, idx, child in children:
+                if 1 + _path_bound(idx, child, light) <= best:
+                    continue
+                length = 1 + search(idx, child)
+                if length > best:
+                    best, best_child = length, (idx, child)
+                if best == _path_bound(loc, free, light):
+                    break
+            memo[key] = (best, best_child)
+            return best
+
+        free = self._region(loc)
+        try:
+            length = search(loc, free)
+        except _SearchStopped:
+            return None
+
+        # Follow the memoized first moves along a longest path
+        path = []
+        for _ in range(length):
+            loc, free = memo[(loc, free)][1]
+            path.append(self._table.cells[loc])
+        return path
+
     def __get_moves(self, loc):
         """Generate the list of possible moves for an L-shaped motion (like a
-        knight in chess).
+        knight in chess) from the cell index `loc`.
         """
         if loc == Board.NOT_MOVED:
             return self.get_blank_spaces()
 
-        r, c = loc
-        directions = [(-2, -1), (-2, 1), (-1, -2), (-1, 2),
-                      (1, -2), (1, 2), (2, -1), (2, 1)]
-        valid_moves = [(r + dr, c + dc) for dr, dc in directions
-                       if self.move_is_legal((r + dr, c + dc))]
-        random.shuffle(valid_moves)
+        occupied = self._occupied
+        valid_moves = [move for bit, move in self._table.neighbors[loc]
+                       if not occupied & bit]
+        if self._shuffle:
+            random.shuffle(valid_moves)
         return valid_moves
 
     def print_board(self):
@@ -271,8 +796,8 @@ class Board(object):
         the location of each player and indicating which cells have been
         blocked, and which remain open.
         """
-        p1_loc = self._board_state[-1]
-        p2_loc = self._board_state[-2]
+        p1_loc = self._p1_loc
+        p2_loc = self._p2_loc
 
         col_margin = len(str(self.height - 1)) + 1
         prefix = "{:<" + "{}".format(col_margin) + "}"
@@ -282,7 +807,7 @@ class Board(object):
             out += prefix.format(i) + ' | '
             for j in range(self.width):
                 idx = i + j * self.height
-                if not self._board_state[idx]:
+                if not (self._occupied >> idx) & 1:
                     out += ' '
                 elif p1_loc == idx:
                     out += symbols[0]
@@ -295,7 +820,7 @@ class Board(object):
 
         return out
 
-    def play(self, time_limit=TIME_LIMIT_MILLIS):
+    def play(self, time_limit=TIME_LIMIT_MILLIS, move_times=None):
         """Execute a match between the players by alternately soliciting them
         to select a move and applying it in the game.
 
@@ -305,6 +830,10 @@ class Board(object):
             The maximum number of milliseconds to allow before timeout
             during each turn.
 
+        move_times : list (optional)
+            If given, the number of milliseconds taken by each move of the
+            returned history is appended to this list.
+
         Returns
         ----------
         (player, list<[(int, int),]>, str)
@@ -338,5 +867,7 @@ class Board(object):
                 return self._inactive_player, move_history, "illegal move"
 
             move_history.append(list(curr_move))
+            if move_times is not None:
+                move_times.append(time_limit - move_end)
 
             self.apply_move(curr_move)
@@ -0,0 +1,308 @@
+"""A multi-process alpha-beta agent (Lazy SMP).
+
+`ParallelPlayer` runs its usual iterative deepening search in the main
+process while helper processes search the same position at staggered
+depths (every other helper starts one ply deeper). There is no explicit
+work splitting: all the searches share a transposition table in shared
+memory, so the helpers mostly fill the table with results that the main
+search then takes as cutoffs or move ordering hints. When the main search
+stops, the deepest completed iteration among all the processes is played.
+
+The helpers read the same deadline as the main search, converted to the
+system-wide monotonic clock, so the move is returned within the time limit
+of `Board.play()`.
+
+The player lives outside of `game_agent.py` because it needs the
+`multiprocessing` module, which the project assistant sandbox does not
+allow. Helper processes cannot be started from the daemonic worker
+processes of `tournament.py --workers N`, so the tournament only plays it in
+serial runs.
+
+Run `python lazy_smp.py --help` to measure the speedup of fixed-depth
+searches with 1 to N processes.
+"""
+import argparse
+import ctypes
+import multiprocessing
+import timeit
+
+from game_agent import (AlphaBetaPlayer, KillerHistoryOrdering,
+                        TranspositionTable, custom_score)
+
+NUM_PROCESSES = 2  # number of searching processes, including the main one
+RESULT_WAIT = 0.5  # fraction of TIMER_THRESHOLD spent waiting for helpers
+NO_MOVE = 0xffff  # move field of shared table entries without a move
+
+
+class SharedTranspositionTable(TranspositionTable):
+    """Transposition table in shared memory, read and written by several
+    processes without locks.
+
+    Each slot holds three 64-bit words: the key XORed with the two other
+    words, the packed (depth, flag, move, generation) fields, and the value
+    as a double. The move field holds 8 bits per coordinate, so the table
+    serves boards of up to 255 rows and columns. A process may read a slot while another one writes it; the
+    XOR check then fails and the probe misses, as it does for an entry of
+    another position (see Hyatt and Mann, "A lock-less transposition table
+    implementation for parallel search chess engines").
+
+    The counters of `stats()` only count the operations of the calling
+    process. See `TranspositionTable` for the parameters.
+    """
+    ENTRY_BYTES = 24
+
+    def __init__(self, size_mb=16, policy="depth"):
+        capacity = max(1, int(size_mb * 2**20) // self.ENTRY_BYTES)
+        self._raw = multiprocessing.RawArray(ctypes.c_uint64, 3 * capacity)
+        super().__init__(size_mb, policy)
+        self._map()
+
+    def _map(self):
+        """Create the views of the shared array used by probe() and store(). """
+        view = memoryview(self._raw).cast("B")
+        self._words = view.cast("Q")
+        self._values = view.cast("d")
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state["_words"], state["_values"]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._map()
+
+    def clear(self):
+        ctypes.memset(self._raw, 0, ctypes.sizeof(self._raw))
+        self.generation = 0
+        self.reset_stats()
+
+    def probe(self, key):
+        self.probes += 1
+        idx = 3 * (key % self.capacity)
+        words = self._words
+        data, bits = words[idx + 1], words[idx + 2]
+        if words[idx] ^ data ^ bits != key or not data:
+            return None
+        self.hits += 1
+        move = (data >> 10) & 0xffff
+        move = None if move == NO_MOVE else (move & 0xff, move >> 8)
+        return (key, data & 0xff, (data >> 8) & 0x3, self._values[idx + 2],
+                move, data >> 26)
+
+    def store(self, key, depth, flag, value, move):
+        idx = 3 * (key % self.capacity)
+        words = self._words
+        data, bits = words[idx + 1], words[idx + 2]
+        if data and words[idx] ^ data ^ bits != key:
+            if (self.policy == "depth" and data >> 26 == self.generation and
+                    data & 0xff > depth):
+                return
+            self.replacements += 1
+        # Stored depths are at least 1, so a used slot has nonzero data
+        packed = NO_MOVE if move is None else move[0] | move[1] << 8
+        data = (min(depth, 0xff) | flag << 8 | packed << 10 |
+                self.generation << 26)
+        self._values[idx + 2] = value
+        words[idx + 1] = data
+        words[idx] = key ^ data ^ words[idx + 2]
+        self.stores += 1
+
+
+def _with_players(game, active, inactive):
+    """Return a copy of the board with the objects of the active and
+    inactive players replaced (e.g., to send it to another process).
+    """
+    board = game.copy()
+    if game.active_player == game._player_1:
+        board._player_1, board._player_2 = active, inactive
+    else:
+        board._player_1, board._player_2 = inactive, active
+    board._active_player, board._inactive_player = active, inactive
+    return board
+
+
+def _clock():
+    """Return the system-wide monotonic clock in milliseconds. """
+    return 1000 * timeit.default_timer()
+
+
+def _helper(index, conn, tt, stop, score_fn, options):
+    """Search the positions received through `conn` until the deadline, or
+    until the main process increments `stop`, and send back the results.
+    """
+    player = AlphaBetaPlayer(score_fn=score_fn, **options)
+    player.tt = tt
+    while True:
+        job = conn.recv()
+        if job is None:
+            return
+        job_id, game, deadline, generation = job
+        game = _with_players(game, player, "Opponent")
+        tt.generation = generation
+
+        def time_left():
+            if stop.value != job_id:
+                return 0.
+            return deadline - _clock()
+
+        # Reset the counters without _start_move(), whose new_game() would
+        # clear the shared table
+        player.time_left = time_left
+        player.nodes = player.leaves = player.cutoffs = 0
+        player._next_check, player._check_nodes = 0, 1
+        player._last_check = None
+        player.depth_completed = 0
+        player._pv_move = None
+        if player.move_ordering is not None:
+            player.move_ordering.new_search()
+
+        # Odd helpers skip the first iteration (claiming it with the first
+        # legal move, which loses the tie against the main search)
+        move = player.iterative_deepening(game, game.get_legal_moves()[0],
+                                          depth=1 + index % 2)
+        conn.send((job_id, player.depth_completed, move, player._root_score,
+                   player.nodes))
+
+
+class ParallelPlayer(AlphaBetaPlayer):
+    """Alpha-beta player searching with several processes (Lazy SMP).
+
+    Parameters
+    ----------
+    processes : int (optional)
+        Number of searching processes, including the main one; 1 searches
+        like an `AlphaBetaPlayer` with a shared-memory table.
+
+    See `AlphaBetaPlayer` for the other parameters; the transposition table
+    is always enabled (16 MB by default) and shared by the processes, and
+    killer/history move ordering is used by default.
+    """
+    def __init__(self, processes=NUM_PROCESSES, score_fn=custom_score,
+                 tt_size_mb=16, tt_policy="depth", move_ordering=None,
+                 **kwargs):
+        super().__init__(score_fn=score_fn, move_ordering=(
+            move_ordering or KillerHistoryOrdering()), **kwargs)
+        self.processes = processes
+        self.tt = SharedTranspositionTable(tt_size_mb, tt_policy)
+        self._options = dict(kwargs, tt_policy=tt_policy,
+                             move_ordering=KillerHistoryOrdering())
+        self._options.pop("book", None)
+        self._helpers = []
+        self._stop = multiprocessing.RawValue(ctypes.c_long, 0)
+        self.helper_nodes = 0
+        self.helper_moves = 0
+
+    def start(self):
+        """Start the helper processes (done by the first search). """
+        while len(self._helpers) < self.processes - 1:
+            conn, child = multiprocessing.Pipe()
+            process = multiprocessing.Process(
+                target=_helper, args=(len(self._helpers) + 1, child, self.tt,
+                                      self._stop, self.score, self._options))
+            process.daemon = True
+            process.start()
+            self._helpers.append((process, conn))
+
+    def close(self):
+        """Stop the helper processes. """
+        for process, conn in self._helpers:
+            conn.send(None)
+            process.join()
+        self._helpers = []
+
+    def iterative_deepening(self, game, best_move, depth=1, max_depth=None):
+        self.start()
+        job_id = self._stop.value + 1
+        self._stop.value = job_id
+        deadline = _clock() + self.time_left()
+        job = (job_id, _with_players(game, "Player", "Opponent"), deadline,
+               self.tt.generation)
+        for _, conn in self._helpers:
+            conn.send(job)
+
+        move = super().iterative_deepening(game, best_move, depth, max_depth)
+
+        # Stop the helpers and play the deepest completed iteration, which
+        # is found by the main search on ties
+        self._stop.value = job_id + 1
+        best_depth = self.depth_completed
+        wait = RESULT_WAIT * self.TIMER_THRESHOLD
+        for _, conn in self._helpers:
+            while conn.poll(max(0., min(wait, self.time_left() - wait)) / 1000):
+                result_id, completed, result, _, nodes = conn.recv()
+                if result_id != job_id:
+                    continue
+                self.helper_nodes += nodes
+                if completed > best_depth and result is not None:
+                    best_depth, move = completed, result
+                    self.helper_moves += 1
+                break
+        self.depth_completed = best_depth
+        return move
+
+
+def speedup(processes, depth, positions=6, seed=1):
+    """Return the time and nodes of the main process needed to complete a
+    fixed-depth iterative deepening search of random positions with 1 to
+    `processes` processes.
+    """
+    import random
+    from isolation import Board
+    rng = random.Random(seed)
+    games = []
+    while len(games) < positions:
+        game = Board("Player", "Opponent")
+        for _ in range(rng.randrange(6, 14)):
+            moves = game.get_legal_moves()
+            if not moves:
+                break
+            game.apply_move(rng.choice(moves))
+        if len(game.get_legal_moves()) > 1:
+            games.append(game)
+
+    results = []
+    for n in range(1, processes + 1):
+        player = ParallelPlayer(processes=n, endgame_solver=False)
+        player.start()
+        elapsed = nodes = 0
+        for game in games:
+            board = _with_players(game, player, "Opponent")
+            player.tt.clear()
+            player.time_left = lambda: 1e9
+            player._start_move(board)
+            player.search_depth = 1
+            player._pv_move = None
+            player.move_ordering.new_search()
+            start = timeit.default_timer()
+            player.iterative_deepening(board, board.get_legal_moves()[0],
+                                       max_depth=depth)
+            elapsed += timeit.default_timer() - start
+            nodes += player.nodes
+        player.close()
+        results.append((n, elapsed, nodes))
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description=__doc__,
+        formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("-p", "--processes", type=int,
+                        default=multiprocessing.cpu_count(),
+                        help="largest number of processes "
+                             "(default: %(default)s)")
+    parser.add_argument("-d", "--depth", type=int, default=8,
+                        help="search depth (default: %(default)s)")
+    args = parser.parse_args(argv)
+
+    print("{:>9} {:>10} {:>8} {:>12}".format("Processes", "Time (s)",
+                                             "Speedup", "Main nodes"))
+    results = speedup(args.processes, args.depth)
+    for n, elapsed, nodes in results:
+        print("{:>9} {:>10.2f} {:>8.2f} {:>12,}".format(
+            n, elapsed, results[0][1] / elapsed, nodes))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,195 @@
+"""An alpha-beta agent that keeps searching during the opponent's turn.
+
+After choosing a move, `PonderingPlayer` predicts the opponent's reply and
+searches the resulting position in a background thread until its next turn
+(or for at most `ponder_limit` milliseconds). If the opponent played the
+predicted reply, the next search resumes iterative deepening from the depth
+reached while pondering; otherwise the transposition table still holds the
+results of the pondering search.
+
+The player lives outside of `game_agent.py` because it needs the
+`threading` module, which the project assistant sandbox does not allow.
+
+NOTE: Python threads share one interpreter lock, so when both agents run in
+the same process (as in `Board.play()`), pondering takes CPU time from the
+opponent's search as well as using idle cores. For this reason the player is
+not one of the agents of `tournament.py`, whose results would be biased.
+"""
+import threading
+import time
+import timeit
+
+from game_agent import AlphaBetaPlayer, SearchTimeout, custom_score
+
+PONDER_LIMIT = 1000.  # maximum duration in milliseconds of a ponder search
+PREDICT_DEPTH = 3  # depth of the search predicting the opponent's reply
+START_DELAY = 0.005  # seconds left to the caller before pondering starts
+
+
+class PonderingPlayer(AlphaBetaPlayer):
+    """Alpha-beta player that searches on the opponent's time.
+
+    Parameters
+    ----------
+    ponder_limit : float (optional)
+        Maximum duration in milliseconds of the search during the opponent's
+        turn.
+
+    predict_depth : int (optional)
+        Depth of the search that predicts the opponent's reply when the
+        transposition table has no move for it.
+
+    See `AlphaBetaPlayer` for the other parameters; the transposition table
+    is enabled by default, since it carries the pondering results over to
+    the next search.
+    """
+    def __init__(self, score_fn=custom_score, tt_size_mb=16,
+                 ponder_limit=PONDER_LIMIT, predict_depth=PREDICT_DEPTH,
+                 **kwargs):
+        super().__init__(score_fn=score_fn, tt_size_mb=tt_size_mb, **kwargs)
+        self.ponder_limit = ponder_limit
+        self.predict_depth = predict_depth
+        self._thread = None
+        self._stop = None
+        self._prediction = None
+        self._ponder_result = None
+        self.reset_ponder_stats()
+
+    def reset_ponder_stats(self):
+        """Reset the pondering counters. """
+        self.ponders = 0
+        self.hits = 0
+        self.resumed_depth = 0
+
+    def ponder_stats(self):
+        """Return a dictionary of the number of ponder searches, of correct
+        predictions (hits) and their rate, and of the average depth the
+        searches of the hits resumed from.
+        """
+        return {"ponders": self.ponders,
+                "hits": self.hits,
+                "hit_rate": self.hits / self.ponders if self.ponders else 0.,
+                "resumed_depth": (self.resumed_depth / self.hits
+                                  if self.hits else 0.)}
+
+    def new_game(self):
+        self.stop_pondering()
+        self._prediction = None
+        self._ponder_result = None
+        super().new_game()
+
+    def get_move(self, game, time_left):
+        """Stop pondering, search for the best move (see
+        `AlphaBetaPlayer.get_move()`), and start pondering on the position
+        after the move.
+        """
+        self.stop_pondering()
+        if self._prediction is not None:
+            self.ponders += 1
+            if self._prediction == (game.hash(), game.move_count):
+                self.hits += 1
+            else:
+                self._ponder_result = None
+            self._prediction = None
+
+        move = super().get_move(game, time_left)
+        self._ponder_result = None
+        if move in game.get_legal_moves():
+            self.start_pondering(game.forecast_move(move))
+        return move
+
+    def iterative_deepening(self, game, best_move, depth=1, max_depth=None):
+        # Resume from the search of the same position during the opponent's
+        # turn, if any
+        result = self._ponder_result
+        self._ponder_result = None
+        if result is not None and result[0] == (game.hash(), game.move_count):
+            self.resumed_depth += result[2]
+            best_move, depth = result[1], result[2] + 1
+        return super().iterative_deepening(game, best_move, depth, max_depth)
+
+    def start_pondering(self, game):
+        """Start searching, in a background thread, the position reached
+        after the predicted reply of the opponent, who is to move in `game`.
+        """
+        if not game.get_legal_moves():
+            return
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._ponder,
+                                        args=(game, self._stop))
+        self._thread.daemon = True
+        self._thread.start()
+
+    def stop_pondering(self):
+        """Stop the background search and wait for it to return. """
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join()
+            self._thread = None
+
+    def predict_reply(self, game):
+        """Return the predicted move of the opponent, who is to move in
+        `game`: the move stored by the transposition table for the position,
+        or the best reply of a `predict_depth` search.
+        """
+        replies = game.get_legal_moves()
+        if self.tt is not None:
+            key, symmetry = self._tt_key(game)
+            entry = self.tt.probe(key)
+            if entry is not None:
+                reply = entry[4]
+                if symmetry:
+                    reply = game.from_canonical(reply, symmetry)
+                if reply in replies:
+                    return reply
+
+        self._root_depth = self.predict_depth
+        best_reply, best_score = replies[0], float("inf")
+        for reply in replies:
+            score = self.max_value(game.forecast_move(reply),
+                                   self.predict_depth - 1, float("-inf"),
+                                   best_score)
+            if score < best_score:
+                best_reply, best_score = reply, score
+        return best_reply
+
+    def _ponder(self, game, stop):
+        """Search the position after the predicted reply until `stop` is set
+        or `ponder_limit` expires, and keep the result for `get_move()`.
+        """
+        # Let the caller take the move (and read its clock) before this
+        # thread starts competing for the interpreter lock
+        if stop.wait(START_DELAY):
+            return
+        start = timeit.default_timer()
+
+        def time_left():
+            # Yield the interpreter lock at every clock check (about every
+            # millisecond), so the opponent's search thread waits less than
+            # a full switch interval to get it back
+            time.sleep(0)
+            if stop.is_set():
+                return 0.
+            return self.ponder_limit - 1000 * (timeit.default_timer() - start)
+
+        self.time_left = time_left
+        try:
+            reply = self.predict_reply(game)
+        except SearchTimeout:
+            return
+        game = game.forecast_move(reply)
+        legal_moves = game.get_legal_moves()
+        if not legal_moves:
+            return
+        self._prediction = (game.hash(), game.move_count)
+
+        if self.tt is not None:
+            self.tt.new_search()
+        if self.move_ordering is not None:
+            self.move_ordering.new_search()
+        self._pv_move = None
+        self.depth_completed = 0
+        move = self.iterative_deepening(game, legal_moves[0])
+        if self.depth_completed:
+            self._ponder_result = (self._prediction, move,
+                                   self.depth_completed)
@@ -0,0 +1,157 @@
+"""Game records: a compact format for archiving played games, and streaming
+writers and readers of game logs.
+
+A log holds one game per line in JSON Lines format (gzip-compressed if the
+path ends with ".gz"), e.g.:
+
+    {"width":7,"height":7,"players":["AB_Custom","AB_Improved"],
+     "opening":[[2,3],[0,5]],"moves":[[4,4],[1,3],...],
+     "times":[148.2,147.9,...],"winner":1,"termination":"illegal move"}
+
+(on a single line), where `opening` lists the moves applied before
+`Board.play()`, `moves` and `times` the moves chosen by the players during
+the game and the milliseconds each one took, `winner` the seat of the winner
+(0 for player 1, 1 for player 2) and `termination` the reason returned by
+`Board.play()`. Records are appended as games finish and read back one at a
+time, so neither side ever holds more than one game in memory.
+
+`python tournament.py --record games.jsonl.gz` logs the games of a
+tournament. Run `python records.py games.jsonl.gz` to summarize a log, and
+`python records.py games.jsonl.gz --game N` to print the move history of a
+game in the format of the `isoviz/display.html` text area; the page can
+also load a game from a log file directly.
+"""
+import argparse
+import gzip
+import json
+from collections import Counter, namedtuple
+
+TIME_DIGITS = 1  # decimal digits of the move times written to logs
+
+
+class GameRecord(namedtuple("GameRecord", [
+        "width", "height", "players", "opening", "moves", "times", "winner",
+        "termination"])):
+    """The record of a game (see the module docstring for the fields); moves
+    are [row, column] lists as in the history returned by `Board.play()`.
+    """
+    __slots__ = ()
+
+    def history(self):
+        """Return every move of the game, opening included, which is the
+        move history expected by `isoviz/display.html`.
+        """
+        return [list(move) for move in self.opening] + list(self.moves)
+
+    def to_json(self):
+        """Return the record as a single line of JSON. """
+        record = self._replace(
+            opening=[list(move) for move in self.opening],
+            times=[round(t, TIME_DIGITS) for t in self.times])
+        return json.dumps(record._asdict(), separators=(",", ":"))
+
+    @classmethod
+    def from_json(cls, line):
+        """Return the record of a line of JSON written by `to_json()`. """
+        return cls(**json.loads(line))
+
+
+def _open(path, mode):
+    """Open a log file in text mode, with gzip compression if the path ends
+    with ".gz".
+    """
+    if path.endswith(".gz"):
+        return gzip.open(path, mode + "t", encoding="utf-8")
+    return open(path, mode, encoding="utf-8")
+
+
+class RecordWriter:
+    """Append game records to a log file; use it as a context manager or
+    call `close()`.
+
+    Appending to an existing gzip log adds a new compressed member, which
+    gzip readers (including `read_records()`) read as a single stream.
+
+    Parameters
+    ----------
+    path : str
+        The log file, created if it does not exist.
+    """
+    def __init__(self, path):
+        self.path = path
+        self.count = 0
+        self._file = _open(path, "a")
+
+    def write(self, record):
+        """Append a `GameRecord` to the log. """
+        self._file.write(record.to_json() + "\n")
+        self.count += 1
+
+    def close(self):
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def read_records(path):
+    """Yield the `GameRecord`s of a log file one at a time. """
+    with _open(path, "r") as f:
+        for line in f:
+            if line.strip():
+                yield GameRecord.from_json(line)
+
+
+def summarize(records):
+    """Return the number of games, the wins of each player name, the count
+    of each termination reason and the average number of moves and
+    milliseconds per move of a stream of records.
+    """
+    games = moves = 0
+    time = 0.
+    wins, terminations = Counter(), Counter()
+    for record in records:
+        games += 1
+        moves += len(record.moves)
+        time += sum(record.times)
+        wins[record.players[record.winner]] += 1
+        terminations[record.termination] += 1
+    return (games, wins, terminations, moves / max(games, 1),
+            time / max(moves, 1))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description=__doc__,
+        formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("log", help="game log (JSON Lines, optionally .gz)")
+    parser.add_argument("-g", "--game", type=int, metavar="N",
+                        help="print the move history of the N-th game "
+                             "(from 0) instead of a summary")
+    args = parser.parse_args(argv)
+
+    if args.game is not None:
+        count = 0
+        for count, record in enumerate(read_records(args.log), 1):
+            if count - 1 == args.game:
+                print("{} vs {}: {} won ({})".format(
+                    record.players[0], record.players[1],
+                    record.players[record.winner], record.termination))
+                print(json.dumps(record.history()))
+                return
+        parser.error("{} holds only {} games".format(args.log, count))
+
+    games, wins, terminations, moves, time = summarize(read_records(args.log))
+    print("{} games, {:.1f} moves per game, {:.1f} ms per move".format(
+        games, moves, time))
+    for name, count in wins.most_common():
+        print("  {:<20} {:>7} wins".format(name, count))
+    for reason, count in terminations.most_common():
+        print("  {:<20} {:>7} games".format(reason, count))
+
+
+if __name__ == "__main__":
+    main()
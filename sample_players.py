@@ -8,6 +8,8 @@ own agent and example heuristic functions.
 
 from random import randint
 
+from game_agent import count_moves
+
 
 def null_score(game, player):
     """This heuristic presumes no knowledge for non-terminal states, and
@@ -65,7 +67,7 @@ def open_move_score(game, player):
     if game.is_winner(player):
         return float("inf")
 
-    return float(len(game.get_legal_moves(player)))
+    return float(count_moves(game, player))
 
 
 def improved_score(game, player):
@@ -95,8 +97,8 @@ def improved_score(game, player):
     if game.is_winner(player):
         return float("inf")
 
-    own_moves = len(game.get_legal_moves(player))
-    opp_moves = len(game.get_legal_moves(game.get_opponent(player)))
+    own_moves = count_moves(game, player)
+    opp_moves = count_moves(game, game.get_opponent(player))
     return float(own_moves - opp_moves)
 
 
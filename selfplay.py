@@ -0,0 +1,208 @@
+"""Generate labeled positions for heuristic tuning by self-play.
+
+Games between two fixed-depth `AlphaBetaPlayer` searchers start with a few
+random moves (drawn from a generator seeded per game, so a game only depends
+on its seed) and are played to the end by worker processes. Every position
+where the player to move has legal moves is labeled, from the point of view
+of the player to move, with:
+
+- `features`: float32 (n, len(batch_eval.FEATURES)), the heuristic
+  features of `batch_eval.BatchEvaluator.features()`
+- `scores`: float32 (n,), the score of the search of the position (+/-inf
+  when the search proved the outcome)
+- `outcomes`: int8 (n,), 1 if the player to move won the game, else 0
+
+The main process streams the positions of finished games to compressed
+NumPy files of CHUNK_SIZE positions each (`chunk-00000.npz`, ...) in the
+output directory, so memory use does not grow with the number of games;
+running the script again adds chunks after the existing ones:
+
+    python selfplay.py --output data --games 10000 --workers 4 --seed 1
+
+`tune.py` fits heuristic weights to the chunks. Run
+`python selfplay.py --help` for the other options.
+"""
+import argparse
+import glob
+import multiprocessing
+import os
+import random
+import timeit
+
+import numpy as np
+
+from batch_eval import FEATURES, BatchEvaluator, encode
+from book import make_searcher, search
+from isolation import Board
+from game_agent import custom_score
+
+DEPTH = 5  # search depth of every self-play move
+OPENING_PLIES = 4  # random moves played at the start of each game
+CHUNK_SIZE = 2**16  # number of positions of each chunk file
+CHUNK_PATTERN = "chunk-{:05d}.npz"  # names of the chunk files
+
+
+def play_game(seed, depth=DEPTH, width=7, height=7,
+              opening_plies=OPENING_PLIES, score_fn=custom_score):
+    """Play a self-play game and return the (features, scores, outcomes)
+    arrays of its positions (see the module docstring).
+    """
+    rng = random.Random(seed)
+    players = [make_searcher(score_fn), make_searcher(score_fn)]
+    game = Board(players[0], players[1], width, height, shuffle=False)
+    for _ in range(opening_plies):
+        moves = game.get_legal_moves()
+        if not moves:
+            break
+        game.apply_move(rng.choice(moves))
+
+    positions, scores = [], []
+    while game.get_legal_moves():
+        player = game.active_player
+        positions.append(game.copy())
+        move = search(player, game, depth)
+        scores.append(player._root_score)
+        game.apply_move(move)
+
+    # The player left without legal moves lost
+    loser = game.active_player
+    outcomes = np.array([board.active_player is not loser
+                         for board in positions], dtype=np.int8)
+    if not positions:
+        return (np.empty((0, len(FEATURES)), dtype=np.float32),
+                np.empty(0, dtype=np.float32), outcomes)
+    blocked, own, opp, _ = encode(positions)
+    features = BatchEvaluator(width, height).features(blocked, own, opp)
+    return (features.astype(np.float32), np.array(scores, dtype=np.float32),
+            outcomes)
+
+
+def _play_task(task):
+    """Play a game in a worker process. """
+    return play_game(*task)
+
+
+class ChunkWriter:
+    """Buffer labeled positions and write them to chunk files of
+    `chunk_size` positions in a directory; call `close()` to write the last,
+    partial chunk.
+    """
+    def __init__(self, directory, chunk_size=CHUNK_SIZE):
+        self.directory = directory
+        self.chunk_size = chunk_size
+        self.positions = 0
+        os.makedirs(directory, exist_ok=True)
+        self._index = len(chunk_paths(directory))
+        self._buffer = []
+        self._buffered = 0
+
+    def write(self, features, scores, outcomes):
+        """Add the positions of a game. """
+        self._buffer.append((features, scores, outcomes))
+        self._buffered += len(outcomes)
+        self.positions += len(outcomes)
+        while self._buffered >= self.chunk_size:
+            self._flush(self.chunk_size)
+
+    def _flush(self, size):
+        """Write the first `size` buffered positions to the next chunk. """
+        arrays = [np.concatenate(column) for column in zip(*self._buffer)]
+        path = os.path.join(self.directory, CHUNK_PATTERN.format(self._index))
+        np.savez_compressed(path, features=arrays[0][:size],
+                            scores=arrays[1][:size], outcomes=arrays[2][:size])
+        self._index += 1
+        self._buffer = [tuple(a[size:] for a in arrays)]
+        self._buffered -= size
+
+    def close(self):
+        if self._buffered:
+            self._flush(self._buffered)
+        self._buffer = []
+
+
+def chunk_paths(directory):
+    """Return the sorted paths of the chunk files of a directory. """
+    return sorted(glob.glob(os.path.join(directory, "chunk-*.npz")))
+
+
+def read_chunks(paths):
+    """Yield the (features, scores, outcomes) arrays of each chunk file. """
+    for path in paths:
+        with np.load(path) as data:
+            yield data["features"], data["scores"], data["outcomes"]
+
+
+def generate(output, games, depth=DEPTH, workers=1, seed=0, width=7,
+             height=7, opening_plies=OPENING_PLIES, chunk_size=CHUNK_SIZE,
+             verbose=False):
+    """Play `games` self-play games, seeded `seed` to `seed + games - 1`,
+    in `workers` processes and write their positions to chunk files in the
+    `output` directory.
+
+    Returns
+    -------
+    int
+        The number of positions written.
+    """
+    writer = ChunkWriter(output, chunk_size)
+    tasks = [(seed + i, depth, width, height, opening_plies)
+             for i in range(games)]
+    pool = None
+    if workers > 1:
+        pool = multiprocessing.Pool(workers)
+        results = pool.imap(_play_task, tasks)
+    else:
+        results = map(_play_task, tasks)
+
+    start = timeit.default_timer()
+    try:
+        for count, arrays in enumerate(results, 1):
+            writer.write(*arrays)
+            if verbose and count % 100 == 0:
+                print("{} games, {} positions in {:.0f}s".format(
+                    count, writer.positions, timeit.default_timer() - start),
+                    flush=True)
+    finally:
+        writer.close()
+        if pool is not None:
+            pool.terminate()
+            pool.join()
+    return writer.positions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description=__doc__,
+        formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("-o", "--output", metavar="DIR", required=True,
+                        help="directory of the chunk files")
+    parser.add_argument("-g", "--games", type=int, default=1000,
+                        help="number of games (default: %(default)s)")
+    parser.add_argument("-d", "--depth", type=int, default=DEPTH,
+                        help="search depth (default: %(default)s)")
+    parser.add_argument("-w", "--workers", type=int,
+                        default=multiprocessing.cpu_count(),
+                        help="number of worker processes "
+                             "(default: %(default)s)")
+    parser.add_argument("--seed", type=int, default=0,
+                        help="seed of the first game (default: %(default)s)")
+    parser.add_argument("--width", type=int, default=7,
+                        help="board width (default: %(default)s)")
+    parser.add_argument("--height", type=int, default=7,
+                        help="board height (default: %(default)s)")
+    parser.add_argument("--opening-plies", type=int, default=OPENING_PLIES,
+                        help="random moves at the start of each game "
+                             "(default: %(default)s)")
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE,
+                        help="positions per chunk file "
+                             "(default: %(default)s)")
+    args = parser.parse_args(argv)
+
+    positions = generate(args.output, args.games, args.depth, args.workers,
+                         args.seed, args.width, args.height,
+                         args.opening_plies, args.chunk_size, verbose=True)
+    print("{} positions written to {}".format(positions, args.output))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+"""Sequential probability ratio test (SPRT) and Elo estimates for comparing
+two agents from the results of paired games.
+
+Each pair of games is played from the same random opening with the agents
+swapping seats, and scores 0, 0.5 or 1 point for the candidate agent.
+Treating the pair (rather than the single game) as the unit of observation
+accounts for the correlation between the two games of a pair.
+
+The test is the generalized SPRT used by chess engine testing frameworks: it
+compares H0: elo = elo0 against H1: elo = elo1 with the log-likelihood ratio
+of a normal approximation of the mean pair score, and stops as soon as the
+ratio leaves the interval (log(beta / (1 - alpha)), log((1 - beta) / alpha)).
+The variance of the pair score is estimated with a weak prior of half an
+observation of each possible pair score, so that a streak of identical
+results (e.g., a candidate winning every pair) still has a positive variance
+and the test can stop on it.
+"""
+import math
+
+
+def elo_to_score(elo):
+    """Return the expected score of a player rated `elo` points higher than
+    its opponent.
+    """
+    return 1. / (1. + 10. ** (-elo / 400.))
+
+
+def score_to_elo(score):
+    """Return the Elo difference corresponding to an expected score. """
+    if score <= 0.:
+        return float("-inf")
+    if score >= 1.:
+        return float("inf")
+    return -400. * math.log10(1. / score - 1.)
+
+
+# Pseudo-observations (score, weight) added to the scores by the test
+PRIOR = [(0., 0.5), (0.5, 0.5), (1., 0.5)]
+
+
+def _mean_var(count, total, total_sq):
+    """Return the mean and variance of observations given their count, sum
+    and sum of squares.
+    """
+    mean = total / count
+    return mean, max(total_sq / count - mean * mean, 0.)
+
+
+def elo_interval(scores, z=1.96):
+    """Estimate the Elo difference from a list of scores with error bars.
+
+    Parameters
+    ----------
+    scores : list<float>
+        The score of the candidate in each observation (e.g., each pair of
+        games), between 0 and 1.
+
+    z : float (optional)
+        The number of standard errors of the interval (1.96 gives a 95%
+        confidence interval).
+
+    Returns
+    -------
+    (float, float, float)
+        The Elo estimate and the lower and upper bounds of the interval.
+    """
+    if not scores:
+        return 0., float("-inf"), float("inf")
+    mean, var = _mean_var(len(scores), sum(scores), sum(x * x for x in scores))
+    margin = z * math.sqrt(var / len(scores))
+    return (score_to_elo(mean), score_to_elo(mean - margin),
+            score_to_elo(mean + margin))
+
+
+class SPRT:
+    """Sequential probability ratio test of H0: elo = elo0 against
+    H1: elo = elo1.
+
+    Parameters
+    ----------
+    elo0, elo1 : float
+        The Elo differences of the null and alternative hypotheses.
+
+    alpha : float (optional)
+        The probability of accepting H1 when H0 is true.
+
+    beta : float (optional)
+        The probability of accepting H0 when H1 is true.
+    """
+    H0 = "H0"
+    H1 = "H1"
+
+    def __init__(self, elo0, elo1, alpha=0.05, beta=0.05):
+        if elo1 <= elo0:
+            raise ValueError("elo1 must be greater than elo0")
+        self.elo0 = elo0
+        self.elo1 = elo1
+        self.alpha = alpha
+        self.beta = beta
+        self.lower = math.log(beta / (1. - alpha))
+        self.upper = math.log((1. - beta) / alpha)
+        self.scores = []
+        self._total = 0.
+        self._total_sq = 0.
+
+    def add(self, score):
+        """Record the score (0 to 1) of the next observation. """
+        self.scores.append(score)
+        self._total += score
+        self._total_sq += score * score
+
+    def llr(self):
+        """Return the log-likelihood ratio of H1 over H0. """
+        n = len(self.scores)
+        if not n:
+            return 0.
+        mean, var = _mean_var(n + sum(w for _, w in PRIOR),
+                              self._total + sum(x * w for x, w in PRIOR),
+                              self._total_sq + sum(x * x * w for x, w in PRIOR))
+        s0, s1 = elo_to_score(self.elo0), elo_to_score(self.elo1)
+        return n * (s1 - s0) * (2 * mean - s0 - s1) / (2 * var)
+
+    def status(self):
+        """Return H0 or H1 once a hypothesis is accepted, or None while the
+        test needs more observations.
+        """
+        llr = self.llr()
+        if llr >= self.upper:
+            return SPRT.H1
+        if llr <= self.lower:
+            return SPRT.H0
+        return None
+
+    def elo(self, z=1.96):
+        """Return the Elo estimate and its interval; see `elo_interval()`. """
+        return elo_interval(self.scores, z)
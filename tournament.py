@@ -10,21 +10,37 @@ The matches are fair because the board is initialized randomly for both
 players, and the players play each match twice -- once as the first player and
 once as the second player.  Randomizing the openings and switching the player
 order corrects for imbalances due to both starting position and initiative.
+
+Run `python tournament.py --help` to select the agents, the number of
+matches, the time limit, the board size, the number of worker processes, the
+random seed and a checkpoint file from the command line.
 """
+import argparse
+import contextlib
+import importlib
 import itertools
+import json
+import multiprocessing
+import os
 import random
 import warnings
 
 from collections import namedtuple
 
 from isolation import Board
+from lazy_smp import ParallelPlayer
+from records import GameRecord, RecordWriter
+from sprt import SPRT
 from sample_players import (RandomPlayer, open_move_score,
                             improved_score, center_score)
-from game_agent import (MinimaxPlayer, AlphaBetaPlayer, custom_score,
-                        custom_score_2, custom_score_3)
+from game_agent import (MinimaxPlayer, AlphaBetaPlayer, MCTSPlayer,
+                        custom_score, custom_score_2, custom_score_3)
 
 NUM_MATCHES = 5  # number of matches against each opponent
 TIME_LIMIT = 150  # number of milliseconds before timeout
+NUM_WORKERS = 1  # number of processes playing games (1 plays them serially)
+BOOK_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                         "book.bin")  # opening book of the AB_Book agent
 
 DESCRIPTION = """
 This script evaluates the performance of the custom_score evaluation
@@ -36,39 +52,327 @@ game_agent.py.
 
 Agent = namedtuple("Agent", ["player", "name"])
 
+# Agents that can be selected by name from the command line
+AGENTS = {
+    "Random": lambda: RandomPlayer(),
+    "MM_Open": lambda: MinimaxPlayer(score_fn=open_move_score),
+    "MM_Center": lambda: MinimaxPlayer(score_fn=center_score),
+    "MM_Improved": lambda: MinimaxPlayer(score_fn=improved_score),
+    "AB_Open": lambda: AlphaBetaPlayer(score_fn=open_move_score),
+    "AB_Center": lambda: AlphaBetaPlayer(score_fn=center_score),
+    "AB_Improved": lambda: AlphaBetaPlayer(score_fn=improved_score),
+    "AB_Custom": lambda: AlphaBetaPlayer(score_fn=custom_score),
+    "AB_Custom_2": lambda: AlphaBetaPlayer(score_fn=custom_score_2),
+    "AB_Custom_3": lambda: AlphaBetaPlayer(score_fn=custom_score_3),
+    "AB_Book": lambda: AlphaBetaPlayer(score_fn=custom_score, book=BOOK_FILE),
+    "MCTS": lambda: MCTSPlayer(),
+    "AB_LazySMP": lambda: ParallelPlayer(score_fn=custom_score),
+}
+
+TEST_AGENTS = ["AB_Improved", "AB_Custom", "AB_Custom_2", "AB_Custom_3"]
+CPU_AGENTS = ["Random", "MM_Open", "MM_Center", "MM_Improved", "AB_Open",
+              "AB_Center", "AB_Improved"]
+
+
+def make_agent(spec):
+    """Construct an agent from a registered name (see `AGENTS`) or from the
+    import path of a score function, e.g., "my_heuristics:score" or
+    "my_heuristics.score", which is played by an `AlphaBetaPlayer`.
+    """
+    if spec in AGENTS:
+        return Agent(AGENTS[spec](), spec)
+
+    if ":" in spec:
+        module_name, _, fn_name = spec.partition(":")
+    else:
+        module_name, _, fn_name = spec.rpartition(".")
+    if not module_name or not fn_name:
+        raise ValueError("Unknown agent {!r}: use one of {} or the import "
+                         "path of a score function".format(
+                             spec, ", ".join(sorted(AGENTS))))
+    score_fn = getattr(importlib.import_module(module_name), fn_name)
+    return Agent(AlphaBetaPlayer(score_fn=score_fn), "AB_" + fn_name)
+
+
+class Checkpoint:
+    """Results of the games played so far, saved to a JSON file so that an
+    interrupted tournament can resume where it stopped.
+
+    Results are recorded per opponent in the order the games are scheduled.
+    Resuming only makes sense if the schedule is the same, so the settings
+    of the tournament (agents, matches, time limit, board size and seed) are
+    stored with the results and must match when the file is loaded.
+
+    Parameters
+    ----------
+    path : str
+        The checkpoint file; it is loaded if it exists.
+
+    settings : dict
+        JSON serializable settings of the tournament.
+
+    every : int (optional)
+        The number of games played between two saves.
+    """
+    def __init__(self, path, settings, every=50):
+        self.path = path
+        self.settings = settings
+        self.every = every
+        self.results = {}
+        if os.path.exists(path):
+            with open(path) as f:
+                data = json.load(f)
+            if data["settings"] != settings:
+                raise ValueError(
+                    "Checkpoint {} was written by a tournament with different "
+                    "settings: {}".format(path, data["settings"]))
+            self.results = data["results"]
+
+    def get(self, key):
+        """Return the list of (winner seat, termination) results saved for
+        the round with the given key.
+        """
+        return [tuple(result) for result in self.results.get(key, [])]
+
+    def extend(self, key, results):
+        """Append results to the round with the given key and save. """
+        self.results.setdefault(key, []).extend(results)
+        self.save()
+
+    def save(self):
+        """Atomically write the checkpoint file. """
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump({"settings": self.settings, "results": self.results}, f)
+        os.replace(tmp_path, self.path)
+
+
+def play_game(player_1, player_2, opening, time_limit=TIME_LIMIT, width=7,
+              height=7):
+    """Play a single game after applying the opening moves.
+
+    Returns
+    -------
+    (int, str, list, `records.GameRecord`)
+        The seat of the winner (0 for player 1, 1 for player 2), the
+        termination reason returned by `Board.play()`, the search
+        statistics of each player (see `summarize_stats()`), and the record
+        of the game, whose player names are left to the caller.
+    """
+    for player in (player_1, player_2):
+        if hasattr(player, "new_game"):
+            player.new_game()
+    game = Board(player_1, player_2, width=width, height=height)
+    for move in opening:
+        game.apply_move(move)
+    times = []
+    winner, history, termination = game.play(time_limit=time_limit,
+                                             move_times=times)
+    winner = int(winner is player_2)
+    record = GameRecord(width, height, None, opening, history, times, winner,
+                        termination)
+    return (winner, termination,
+            [summarize_stats(player_1), summarize_stats(player_2)], record)
+
+
+def summarize_stats(player):
+    """Return the totals over the last game of the search statistics
+    recorded by an `IsolationPlayer` (see `game_agent.MoveStats`), as a list
+    of [moves, nodes, leaves, cutoffs, depth, time] where `depth` is the sum
+    of the depths completed on each move and `time` is in milliseconds, or
+    None if the player does not record statistics.
+    """
+    moves = getattr(player, "game_stats", None)
+    if moves is None:
+        return None
+    return [len(moves), sum(m.nodes for m in moves),
+            sum(m.leaves for m in moves), sum(m.cutoffs for m in moves),
+            sum(m.depth for m in moves), sum(m.time_used for m in moves)]
+
+
+# Players of the tournament, sent once to each worker process
+_worker_players = None
+
+
+def _init_worker(players, cores, counter, seed):
+    """Store the tournament players in a new worker process and pin it to
+    its own CPU core, so concurrent games do not compete for the same core
+    while their move timers are running.
+    """
+    global _worker_players
+    _worker_players = players
+
+    with counter.get_lock():
+        worker_id = counter.value
+        counter.value += 1
+    if seed is not None:
+        random.seed(seed + worker_id)
+    if hasattr(os, "sched_setaffinity"):
+        os.sched_setaffinity(0, {cores[worker_id % len(cores)]})
+
+
+def _play_task(task):
+    """Play a game in a worker process; the players are given by their
+    index in the tournament player list.
+    """
+    idx_1, idx_2, opening, time_limit, width, height = task
+    return play_game(_worker_players[idx_1], _worker_players[idx_2],
+                     opening, time_limit, width, height)
+
+
+class GameRunner:
+    """Play batches of independent games, either serially in the current
+    process or spread across a pool of worker processes (one per core).
+
+    Parameters
+    ----------
+    players : list<object>
+        Every player object taking part in the tournament.
+
+    num_workers : int (optional)
+        The number of worker processes; at most one worker is started per
+        available CPU core. With a single worker, games are played in the
+        current process using the original player objects.
 
-def play_round(cpu_agent, test_agents, win_counts, num_matches):
+    seed : int (optional)
+        Seed of the random number generator of each worker process.
+    """
+    def __init__(self, players, num_workers=1, seed=None):
+        self.players = list(players)
+        self._index = {id(player): i for i, player in enumerate(self.players)}
+        self._pool = None
+
+        if hasattr(os, "sched_getaffinity"):
+            cores = sorted(os.sched_getaffinity(0))
+        else:
+            cores = list(range(multiprocessing.cpu_count()))
+        num_workers = min(num_workers, len(cores))
+        self.num_workers = max(num_workers, 1)
+        if num_workers > 1:
+            self._pool = multiprocessing.Pool(
+                num_workers, initializer=_init_worker,
+                initargs=(self.players, cores, multiprocessing.Value("i", 0),
+                          seed))
+
+    def play(self, games):
+        """Play a list of games, each one a tuple (player_1, player_2,
+        opening, time_limit, width, height), and return the list of results
+        of `play_game()` in the same order.
+        """
+        return list(self.imap(games))
+
+    def imap(self, games):
+        """Play a list of games like `play()`, but yield the result of each
+        game as soon as it and the games before it are finished.
+        """
+        if self._pool is None:
+            return (play_game(*game) for game in games)
+        tasks = [(self._index[id(game[0])], self._index[id(game[1])]) + game[2:]
+                 for game in games]
+        return self._pool.imap(_play_task, tasks, chunksize=1)
+
+    def close(self):
+        """Shut down the worker processes. """
+        if self._pool is not None:
+            self._pool.close()
+            self._pool.join()
+            self._pool = None
+
+
+def random_opening(player_1, player_2, width=7, height=7, rng=random):
+    """Return a random opening move and response. """
+    board = Board(player_1, player_2, width=width, height=height)
+    opening = []
+    for _ in range(2):
+        move = rng.choice(board.get_legal_moves())
+        board.apply_move(move)
+        opening.append(move)
+    return opening
+
+
+def play_round(cpu_agent, test_agents, win_counts, num_matches,
+               runner=None, time_limit=TIME_LIMIT, width=7, height=7,
+               rng=random, checkpoint=None, search_stats=None, records=None):
     """Compare the test agents to the cpu agent in "fair" matches.
 
     "Fair" matches use random starting locations and force the agents to
     play as both first and second player to control for advantages resulting
     from choosing better opening moves or having first initiative to move.
+
+    The openings are drawn from `rng` before any game is played, so a seeded
+    generator always produces the same schedule of games. If a `Checkpoint`
+    is given, the games it already holds results for are skipped and new
+    results are saved as they come in. If a `search_stats` dict is given,
+    the search statistics of each player (see `summarize_stats()`) are added to the
+    totals it maps the player to. If a `records.RecordWriter` is given, the
+    record of each game is written as soon as the game is played, and is not
+    kept with the results.
     """
-    timeout_count = 0
-    forfeit_count = 0
-    for _ in range(num_matches):
+    if runner is None:
+        runner = GameRunner([cpu_agent.player] + [a.player for a in test_agents])
 
-        games = sum([[Board(cpu_agent.player, agent.player),
-                      Board(agent.player, cpu_agent.player)]
-                    for agent in test_agents], [])
+    games = []
+    for _ in range(num_matches):
 
-        # initialize all games with a random move and response
-        for _ in range(2):
-            move = random.choice(games[0].get_legal_moves())
-            for game in games:
-                game.apply_move(move)
+        pairings = sum([[(cpu_agent.player, agent.player),
+                         (agent.player, cpu_agent.player)]
+                        for agent in test_agents], [])
+
+        # initialize all games with the same random move and response
+        opening = random_opening(*pairings[0], width=width, height=height,
+                                 rng=rng)
+        games.extend((p1, p2, opening, time_limit, width, height)
+                     for p1, p2 in pairings)
+
+    # play all games, saving progress in chunks if there is a checkpoint
+    results = []
+    chunk = len(games)
+    if checkpoint is not None:
+        results = checkpoint.get(cpu_agent.name)[:len(games)]
+        chunk = checkpoint.every
+    names = {agent.player: agent.name
+             for agent in [cpu_agent] + list(test_agents)}
+    for start in range(len(results), len(games), chunk):
+        chunk_games = games[start:start + chunk]
+        chunk_results = []
+        for game, result in zip(chunk_games, runner.imap(chunk_games)):
+            if records is not None:
+                write_record(records, game, result, names)
+            chunk_results.append(result[:3])
+        results.extend(chunk_results)
+        if checkpoint is not None:
+            checkpoint.extend(cpu_agent.name, chunk_results)
+
+    # tally the results
+    timeout_count = 0
+    forfeit_count = 0
+    for game, result in zip(games, results):
+        winner, termination = result[:2]
+        win_counts[game[winner]] += 1
+
+        # results from checkpoints of older versions have no statistics
+        if search_stats is not None and len(result) > 2:
+            for player, summary in zip(game, result[2]):
+                if summary is not None:
+                    totals = search_stats.setdefault(player,
+                                                     [0] * len(summary))
+                    for i, value in enumerate(summary):
+                        totals[i] += value
+
+        if termination == "timeout":
+            timeout_count += 1
+        elif termination == "forfeit":
+            forfeit_count += 1
 
-        # play all games and tally the results
-        for game in games:
-            winner, _, termination = game.play(time_limit=TIME_LIMIT)
-            win_counts[winner] += 1
+    return timeout_count, forfeit_count
 
-            if termination == "timeout":
-                timeout_count += 1
-            elif termination == "forfeit":
-                forfeit_count += 1
 
-    return timeout_count, forfeit_count
+def write_record(records, game, result, names):
+    """Write the record of a game (see `play_game()`), with the player names
+    given by a dict mapping each player to its name.
+    """
+    records.write(result[3]._replace(
+        players=[names[game[0]], names[game[1]]]))
 
 
 def update(total_wins, wins):
@@ -77,9 +381,22 @@ def update(total_wins, wins):
     return total_wins
 
 
-def play_matches(cpu_agents, test_agents, num_matches):
-    """Play matches between the test agent and each cpu_agent individually. """
+def play_matches(cpu_agents, test_agents, num_matches,
+                 num_workers=NUM_WORKERS, time_limit=TIME_LIMIT, width=7,
+                 height=7, seed=None, checkpoint=None, records=None):
+    """Play matches between the test agent and each cpu_agent individually.
+
+    See `play_round()` for the other parameters; `seed` seeds the openings
+    and the random number generators used to play the games.
+    """
+    rng = random
+    if seed is not None:
+        random.seed(seed)
+        rng = random.Random(seed)
+    runner = GameRunner([a.player for a in cpu_agents + test_agents],
+                        num_workers, seed)
     total_wins = {agent.player: 0 for agent in test_agents}
+    search_stats = {}
     total_timeouts = 0.
     total_forfeits = 0.
     total_matches = 2 * num_matches * len(cpu_agents)
@@ -93,7 +410,9 @@ def play_matches(cpu_agents, test_agents, num_matches):
 
         print("{!s:^9}{:^13}".format(idx + 1, agent.name), end="", flush=True)
 
-        counts = play_round(agent, test_agents, wins, num_matches)
+        counts = play_round(agent, test_agents, wins, num_matches, runner,
+                            time_limit, width, height, rng, checkpoint,
+                            search_stats, records)
         total_timeouts += counts[0]
         total_forfeits += counts[1]
         total_wins = update(total_wins, wins)
@@ -114,6 +433,8 @@ def play_matches(cpu_agents, test_agents, num_matches):
             ) for x in enumerate(test_agents)
     ]))
 
+    print_search_stats(test_agents, search_stats)
+
     if total_timeouts:
         print(("\nThere were {} timeouts during the tournament -- make sure " +
                "your agent handles search timeout correctly, and consider " +
@@ -123,34 +444,233 @@ def play_matches(cpu_agents, test_agents, num_matches):
         print(("\nYour ID search forfeited {} games while there were still " +
                "legal moves available to play.\n").format(total_forfeits))
 
+    runner.close()
 
-def main():
 
-    # Define two agents to compare -- these agents will play from the same
+def print_search_stats(agents, search_stats):
+    """Print the search statistics of the agents that recorded them: nodes
+    searched per second, average depth completed, average time per move and
+    average number of nodes, leaf evaluations and cutoffs per move.
+    """
+    rows = [(agent.name, search_stats[agent.player]) for agent in agents
+            if search_stats.get(agent.player, [0])[0]]
+    if not rows:
+        return
+
+    print("\n{:^22}".format("Search statistics") +
+          "".join("{:>9}".format(x) for x in
+                  ["Nodes/s", "Depth", "ms/move", "Nodes", "Leaves",
+                   "Cutoffs"]))
+    for name, (moves, nodes, leaves, cutoffs, depth, time) in rows:
+        print("{:^22}".format(name) + "".join("{:>9}".format(x) for x in [
+            "{:.0f}".format(1000. * nodes / time) if time else "-",
+            "{:.2f}".format(depth / moves),
+            "{:.1f}".format(time / moves),
+            "{:.0f}".format(nodes / moves),
+            "{:.0f}".format(leaves / moves),
+            "{:.0f}".format(cutoffs / moves)]))
+
+
+def play_sprt(candidate, baseline, test, max_pairs, num_workers=NUM_WORKERS,
+              time_limit=TIME_LIMIT, width=7, height=7, seed=None,
+              records=None):
+    """Play pairs of games between the candidate and the baseline agent until
+    the sequential probability ratio test accepts a hypothesis or the number
+    of pairs reaches `max_pairs`.
+
+    Both games of a pair start from the same random opening with the agents
+    swapping seats; the pair scores 0, 0.5 or 1 point for the candidate.
+    Progress, with the Elo estimate and its 95% confidence interval, is
+    printed after every batch of pairs.
+
+    Parameters
+    ----------
+    candidate, baseline : Agent
+        The agents to compare.
+
+    test : `sprt.SPRT`
+        The test that decides when to stop.
+
+    max_pairs : int
+        The maximum number of pairs of games to play.
+
+    records : `records.RecordWriter` (optional)
+        Log of the records of the games.
+
+    Returns
+    -------
+    str or None
+        `SPRT.H0`, `SPRT.H1`, or None if no hypothesis was accepted.
+    """
+    rng = random
+    if seed is not None:
+        random.seed(seed)
+        rng = random.Random(seed)
+    runner = GameRunner([candidate.player, baseline.player], num_workers, seed)
+    batch_size = max(8, 2 * runner.num_workers)
+
+    print("SPRT {} vs {}: H0 elo = {:g}, H1 elo = {:g}, alpha = {:g}, "
+          "beta = {:g}".format(candidate.name, baseline.name, test.elo0,
+                               test.elo1, test.alpha, test.beta))
+    names = {candidate.player: candidate.name, baseline.player: baseline.name}
+    timeouts = 0
+    forfeits = 0
+    while test.status() is None and len(test.scores) < max_pairs:
+        games = []
+        for _ in range(min(batch_size, max_pairs - len(test.scores))):
+            opening = random_opening(candidate.player, baseline.player,
+                                     width, height, rng)
+            games.append((candidate.player, baseline.player, opening,
+                          time_limit, width, height))
+            games.append((baseline.player, candidate.player, opening,
+                          time_limit, width, height))
+
+        results = []
+        for game, result in zip(games, runner.imap(games)):
+            if records is not None:
+                write_record(records, game, result, names)
+            results.append(result[:3])
+        for first, second in zip(results[::2], results[1::2]):
+            # the candidate plays first in the first game of each pair
+            test.add(((first[0] == 0) + (second[0] == 1)) / 2.)
+        timeouts += sum(result[1] == "timeout" for result in results)
+        forfeits += sum(result[1] == "forfeit" for result in results)
+
+        elo, lower, upper = test.elo()
+        print("{:>7} pairs   Elo {:+7.1f} [{:+.1f}, {:+.1f}]   LLR {:+.2f} "
+              "[{:+.2f}, {:+.2f}]".format(len(test.scores), elo, lower, upper,
+                                          test.llr(), test.lower, test.upper),
+              flush=True)
+    runner.close()
+
+    status = test.status()
+    if status is None:
+        print("\nNo hypothesis accepted after {} pairs.".format(len(test.scores)))
+    else:
+        accepted, rejected = test.elo0, test.elo1
+        if status == test.H1:
+            accepted, rejected = rejected, accepted
+        print("\n{} accepted: the Elo difference of {} over {} is {:g} "
+              "rather than {:g}.".format(status, candidate.name,
+                                         baseline.name, accepted, rejected))
+    if timeouts or forfeits:
+        print("There were {} timeouts and {} forfeits.".format(timeouts,
+                                                              forfeits))
+    return status
+
+
+def open_records(path):
+    """Return a context manager giving a `records.RecordWriter` appending to
+    the game log `path`, or None if `path` is None.
+    """
+    if path is None:
+        return contextlib.nullcontext()
+    return RecordWriter(path)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description=DESCRIPTION,
+        formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument(
+        "-a", "--agents", nargs="+", metavar="AGENT",
+        help="test agents: names from {} or import paths of score functions "
+             "played by AlphaBetaPlayer (e.g. my_heuristics:score)".format(
+                 ", ".join(sorted(AGENTS))))
+    parser.add_argument(
+        "-o", "--opponents", nargs="+", metavar="AGENT",
+        help="agents the test agents play against (same format as --agents)")
+    parser.add_argument("-n", "--matches", type=int, default=NUM_MATCHES,
+                        help="number of matches against each opponent")
+    parser.add_argument("-t", "--time-limit", type=float, default=TIME_LIMIT,
+                        help="milliseconds per move before timeout")
+    parser.add_argument("--width", type=int, default=7,
+                        help="number of board columns")
+    parser.add_argument("--height", type=int, default=7,
+                        help="number of board rows")
+    parser.add_argument("-w", "--workers", type=int, default=NUM_WORKERS,
+                        help="number of worker processes playing games")
+    parser.add_argument("--seed", type=int,
+                        help="seed for the openings and the players")
+    parser.add_argument("--checkpoint", metavar="PATH",
+                        help="save progress to PATH and resume from it if it "
+                             "exists (requires --seed)")
+    parser.add_argument("--record", metavar="PATH",
+                        help="append the record of every game to the game "
+                             "log PATH (JSON Lines, gzipped if PATH ends "
+                             "with .gz; see records.py)")
+    parser.add_argument("--sprt", nargs=2, type=float,
+                        metavar=("ELO0", "ELO1"),
+                        help="instead of a round-robin, play pairs of games "
+                             "between one test agent (default AB_Custom) and "
+                             "one opponent (default AB_Improved) until the "
+                             "SPRT accepts elo = ELO0 or elo = ELO1")
+    parser.add_argument("--alpha", type=float, default=0.05,
+                        help="SPRT false positive rate")
+    parser.add_argument("--beta", type=float, default=0.05,
+                        help="SPRT false negative rate")
+    parser.add_argument("--max-pairs", type=int, default=10000,
+                        help="stop the SPRT after this many pairs of games")
+    args = parser.parse_args(argv)
+
+    if args.sprt:
+        args.agents = args.agents or ["AB_Custom"]
+        args.opponents = args.opponents or ["AB_Improved"]
+        if len(args.agents) != 1 or len(args.opponents) != 1:
+            parser.error("--sprt compares exactly one agent and one opponent")
+        if args.checkpoint:
+            parser.error("--checkpoint is not supported with --sprt")
+    args.agents = args.agents or TEST_AGENTS
+    args.opponents = args.opponents or CPU_AGENTS
+
+    if args.checkpoint and args.seed is None:
+        parser.error("--checkpoint requires --seed so that a resumed "
+                     "tournament plays the same schedule of games")
+
+    # Define the agents to compare -- these agents will play from the same
     # starting position against the same adversaries in the tournament
-    test_agents = [
-        Agent(AlphaBetaPlayer(score_fn=improved_score), "AB_Improved"),
-        Agent(AlphaBetaPlayer(score_fn=custom_score), "AB_Custom"),
-        Agent(AlphaBetaPlayer(score_fn=custom_score_2), "AB_Custom_2"),
-        Agent(AlphaBetaPlayer(score_fn=custom_score_3), "AB_Custom_3")
-    ]
-
-    # Define a collection of agents to compete against the test agents
-    cpu_agents = [
-        Agent(RandomPlayer(), "Random"),
-        Agent(MinimaxPlayer(score_fn=open_move_score), "MM_Open"),
-        Agent(MinimaxPlayer(score_fn=center_score), "MM_Center"),
-        Agent(MinimaxPlayer(score_fn=improved_score), "MM_Improved"),
-        Agent(AlphaBetaPlayer(score_fn=open_move_score), "AB_Open"),
-        Agent(AlphaBetaPlayer(score_fn=center_score), "AB_Center"),
-        Agent(AlphaBetaPlayer(score_fn=improved_score), "AB_Improved")
-    ]
+    try:
+        test_agents = [make_agent(spec) for spec in args.agents]
+        cpu_agents = [make_agent(spec) for spec in args.opponents]
+    except (ValueError, ImportError, AttributeError) as e:
+        parser.error(str(e))
+    if args.workers > 1:
+        for agent in test_agents + cpu_agents:
+            if isinstance(agent.player, ParallelPlayer):
+                parser.error("{} starts helper processes, which the worker "
+                             "processes of --workers cannot do; play it with "
+                             "--workers 1".format(agent.name))
+
+    if args.sprt:
+        try:
+            test = SPRT(args.sprt[0], args.sprt[1], args.alpha, args.beta)
+        except ValueError as e:
+            parser.error(str(e))
+        with open_records(args.record) as records:
+            play_sprt(test_agents[0], cpu_agents[0], test, args.max_pairs,
+                      args.workers, args.time_limit, args.width, args.height,
+                      args.seed, records)
+        return
+
+    checkpoint = None
+    if args.checkpoint:
+        settings = {"agents": args.agents, "opponents": args.opponents,
+                    "matches": args.matches, "time_limit": args.time_limit,
+                    "width": args.width, "height": args.height,
+                    "seed": args.seed}
+        try:
+            checkpoint = Checkpoint(args.checkpoint, settings)
+        except ValueError as e:
+            parser.error(str(e))
 
     print(DESCRIPTION)
     print("{:^74}".format("*************************"))
     print("{:^74}".format("Playing Matches"))
     print("{:^74}".format("*************************"))
-    play_matches(cpu_agents, test_agents, NUM_MATCHES)
+    with open_records(args.record) as records:
+        play_matches(cpu_agents, test_agents, args.matches, args.workers,
+                     args.time_limit, args.width, args.height, args.seed,
+                     checkpoint, records)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,135 @@
+"""Fit heuristic weights to self-play positions (see `selfplay.py`).
+
+The fit is a logistic regression in the style of Texel tuning: the
+probability that the player to move wins a position is modeled as
+sigmoid(w . x + b), where x holds the chosen features of the position (see
+`batch_eval.FEATURES`), and the weights minimize the log loss of the game
+outcomes (plus an L2 penalty). Since a heuristic only needs to rank
+positions, the fitted weights of a linear heuristic can be used as they are
+(e.g., custom_score = own_moves - c * opp_moves with c = -w_opp / w_own).
+
+The weights are fitted with Newton's method: every iteration streams the
+chunk files once, one chunk at a time, and accumulates the gradient and the
+Hessian of the loss, so memory use depends on the chunk size and the number
+of features but not on the number of positions; a few iterations converge.
+
+    python tune.py data --features own_moves opp_moves
+
+Positions whose search proved the outcome (infinite search score) are left
+out by default, since any heuristic is right about them. Run
+`python tune.py --help` for the other options.
+"""
+import argparse
+
+import numpy as np
+
+from batch_eval import FEATURES
+from selfplay import chunk_paths, read_chunks
+
+ITERATIONS = 10  # maximum number of Newton iterations
+TOLERANCE = 1e-6  # largest weight change that stops the iterations
+L2 = 1e-4  # L2 penalty of the feature weights (the bias is not penalized)
+
+
+def _batches(paths, columns, decided):
+    """Yield the design matrix (the chosen feature columns and a column of
+    ones for the bias) and the outcomes of each chunk.
+    """
+    for features, scores, outcomes in read_chunks(paths):
+        if not decided:
+            keep = np.isfinite(scores)
+            features, outcomes = features[keep], outcomes[keep]
+        x = np.ones((len(outcomes), len(columns) + 1))
+        x[:, :-1] = features[:, columns]
+        yield x, outcomes.astype(float)
+
+
+def fit(paths, features=("own_moves", "opp_moves"), iterations=ITERATIONS,
+        l2=L2, decided=False, tolerance=TOLERANCE, verbose=False):
+    """Fit the logistic model to the positions of chunk files.
+
+    Parameters
+    ----------
+    paths : list<str>
+        The chunk files written by `selfplay.py`.
+
+    features : sequence<str> (optional)
+        The names of the features of the model (see `batch_eval.FEATURES`).
+
+    decided : bool (optional)
+        If True, also fit the positions whose search proved the outcome.
+
+    Returns
+    -------
+    (dict, float, int)
+        The weight of each feature and of the "bias", the mean log loss of
+        the positions with the weights of the last iteration, and the
+        number of positions.
+    """
+    columns = [FEATURES.index(name) for name in features]
+    size = len(columns) + 1
+    penalty = np.full(size, l2)
+    penalty[-1] = 0.
+    w = np.zeros(size)
+    loss = float("nan")
+    count = 0
+    for iteration in range(iterations):
+        grad = np.zeros(size)
+        hess = np.zeros((size, size))
+        loss, count = 0., 0
+        for x, y in _batches(paths, columns, decided):
+            z = x @ w
+            p = 0.5 * (1. + np.tanh(0.5 * z))  # sigmoid without overflow
+            grad += x.T @ (p - y)
+            hess += (x * (p * (1. - p))[:, None]).T @ x
+            # log(1 + e^z) - y z, computed without overflow
+            loss += np.sum(np.logaddexp(0., z) - y * z)
+            count += len(y)
+        if not count:
+            raise ValueError("no positions to fit")
+        loss /= count
+        grad = grad / count + penalty * w
+        hess = hess / count + np.diag(penalty)
+        step = np.linalg.solve(hess, grad)
+        w -= step
+        if verbose:
+            print("iteration {}: log loss {:.5f} (before the step)".format(
+                iteration + 1, loss), flush=True)
+        if np.max(np.abs(step)) < tolerance:
+            break
+    return dict(zip(list(features) + ["bias"], w)), loss, count
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description=__doc__,
+        formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("data", help="directory of the chunk files")
+    parser.add_argument("-f", "--features", nargs="+", choices=FEATURES,
+                        default=["own_moves", "opp_moves"],
+                        help="features of the model (default: %(default)s)")
+    parser.add_argument("-i", "--iterations", type=int, default=ITERATIONS,
+                        help="maximum number of Newton iterations "
+                             "(default: %(default)s)")
+    parser.add_argument("--l2", type=float, default=L2,
+                        help="L2 penalty (default: %(default)s)")
+    parser.add_argument("--decided", action="store_true",
+                        help="also fit the positions whose search proved "
+                             "the outcome")
+    args = parser.parse_args(argv)
+
+    paths = chunk_paths(args.data)
+    if not paths:
+        parser.error("no chunk files in {}".format(args.data))
+    weights, loss, count = fit(paths, args.features, args.iterations,
+                               args.l2, args.decided, verbose=True)
+    print("{} positions, log loss {:.5f}".format(count, loss))
+    for name, weight in weights.items():
+        print("  {:<12} {:+.4f}".format(name, weight))
+    if weights.get("own_moves") and "opp_moves" in weights:
+        print("custom_score coefficient (-opp_moves / own_moves): "
+              "{:.3f}".format(-weights["opp_moves"] / weights["own_moves"]))
+
+
+if __name__ == "__main__":
+    main()